@@ -1,5 +1,6 @@
 import curses
 
+from papistui.helpers.frames import frames
 from papistui.helpers.styleparser import StyleParser
 
 
@@ -19,7 +20,9 @@ class CommandInfo:
         """Destroy the command info window and update size and active vars"""
         if self.pad:
             self.pad.erase()
-            self.pad.refresh(
+            frames.refresh(
+                self,
+                self.pad,
                 0,
                 0,
                 self.size["posy"],
@@ -51,11 +54,13 @@ class CommandInfo:
                 xoffset=0,
                 align="left",
             )
-            self.pad.refresh(
-                0,
-                0,
-                self.size["posy"],
-                self.size["posx"],
-                self.size["posy"] + self.size["sizey"],
-                self.size["posx"] + self.size["sizex"] - 2,
-            )
+        frames.refresh(
+            self,
+            self.pad,
+            0,
+            0,
+            self.size["posy"],
+            self.size["posx"],
+            self.size["posy"] + self.size["sizey"],
+            self.size["posx"] + self.size["sizex"] - 2,
+        )
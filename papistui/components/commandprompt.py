@@ -5,6 +5,8 @@ import shlex
 
 from wcwidth import wcwidth  # pip install wcwidth
 
+from papistui.helpers.query import rewriter
+
 locale.setlocale(locale.LC_ALL, "")  # Make sure Unicode works properly
 
 
@@ -53,10 +55,24 @@ class History:
                 self.index[self.mode] = None
                 return []
 
+    def same(self, command, other, mode):
+        """ Check whether two entries mean the same, searches being compared
+        with aliases expanded and whitespace collapsed
+
+        :param command: str entry
+        :param other: str entry
+        :param mode: str "command" or "search"
+        :return bool
+        """
+
+        if mode == "search":
+            return rewriter.normalise(command) == rewriter.normalise(other)
+        return command == other
+
     def save(self, command, mode):
         if not command or mode not in ["command", "search"]:
             return
-        if len(self.list[mode]) > 0 and command == self.list[mode][-1]:
+        if len(self.list[mode]) > 0 and self.same(command, self.list[mode][-1], mode):
             return
         self.list[mode].append(command)
         if self.file[mode]:
@@ -71,6 +87,8 @@ class AutoCompleter:
         self.commandparser = commandparser
         self.list = {"command": [], "search": []}
         self.index = 0
+        # function (field, prefix) -> words completing a search term
+        self.values = None
 
         self.list["command"] += self.argparse_to_strings()
 
@@ -91,6 +109,22 @@ class AutoCompleter:
         else:
             self.index = 0
 
+    def complete_search(self, tokens):
+        """ Return completions of the last word of a search from the values
+        of the field it refers to (e.g. ``author:schl``)
+
+        :param tokens: list of str tokens of the search
+        :return list of ghost suffixes
+        """
+
+        field, _, prefix = tokens[-1].rpartition(":")
+        if not field and len(tokens) > 1 and tokens[-2].endswith(":"):
+            field = tokens[-2][:-1].strip()
+        if not prefix:
+            return []
+        words = self.values(field or None, prefix)
+        return [word[len(prefix) :] for word in words if len(word) > len(prefix)]
+
     def argparse_to_strings(self, include_options=True, include_values=True):
         """
         Generate a flat list of possible commands and their options from argparse.
@@ -132,12 +166,20 @@ class AutoCompleter:
             self.ghosts = []
             return None
 
-        tokens = shlex.split(text, posix=True)
+        try:
+            tokens = shlex.split(text, posix=True)
+        except ValueError:  # quote not closed yet
+            self.ghosts = []
+            return None
         if text.endswith(" "):
             tokens.append("")
 
         last = tokens[-1]
 
+        if self.mode == "search" and self.values is not None:
+            self.ghosts = self.complete_search(tokens)
+            return None
+
         completions = []
 
         for candidate in self.list[self.mode]:
@@ -233,7 +275,18 @@ class CommandPrompt:
     def _display_width(self, chars):
         return sum(max(wcwidth(c), 0) for c in chars)
 
-    def edit(self, mode, prefill=""):
+    def edit(self, mode, prefill="", on_change=None, debounce=0.1):
+        """ Let the user enter text
+
+        :param mode: str mode of the prompt
+        :param prefill: str initial text, defaults to ""
+        :param on_change: function called with the text whenever it changed and
+            no further key was pressed for debounce seconds, defaults to None
+        :param debounce: float seconds to wait for further keys before calling
+            on_change, defaults to 0.1
+        :return str entered text, empty if cancelled
+        """
+
         self.mode = mode
         self.history.reset_indices()
         self.input_chars = list(prefill)
@@ -248,9 +301,18 @@ class CommandPrompt:
         self.win.keypad(True)         # make arrow keys work
         curses.curs_set(1)            # show cursor while editing
         self.display()
+        reported = prefill  # text on_change was last called with
 
         while True:
-            ch = self.win.get_wch()
+            try:
+                ch = self.win.get_wch()
+            except curses.error:
+                # typing paused (only happens while waiting for debounce)
+                self.win.timeout(-1)
+                reported = "".join(self.input_chars)
+                on_change(reported)
+                self.display()
+                continue
 
             if isinstance(ch, str):
                 if ch == "\n":  # Enter
@@ -258,7 +320,7 @@ class CommandPrompt:
                     self.history.save(command, self.mode)
                     break
                 elif ch in ("\x08", "\x7f"):  # Backspace: BS or DEL
-                    if self.cursor > 0:
+                    if self.cursor["input"] > 0:
                         del self.input_chars[self.cursor["input"] - 1]
                         self.cursor["input"] -= 1
                 elif ch == "\t":
@@ -314,7 +376,10 @@ class CommandPrompt:
                     self.cursor["input"] = len(self.input_chars)
 
             self.display()
+            if on_change is not None and "".join(self.input_chars) != reported:
+                self.win.timeout(int(1000 * debounce))
 
+        self.win.timeout(-1)
         curses.curs_set(0)  # hide cursor again
         self.clear()
         return "".join(self.input_chars)
@@ -1,20 +1,34 @@
 import curses
-import re
+import time
 
-from papis.database.cache import match_document
 from papis.docmatcher import DocMatcher
-from papistui.features.sorting import sort_multiple_keys
+from papistui.features.facets import FacetCounts, FacetIndex
+from papistui.features.fuzzy import TrigramIndex
+from papistui.features.index import SearchIndex, narrows
+from papistui.features.parallel import parallel_matches, ready, workers
+from papistui.features.predicate import MatchTexts, compile_query, fold, lower
+from papistui.features.querycache import QueryCache, normalise
+from papistui.features.rowcache import Recorder, RowCache, replay
+from papistui.features.savedsearch import SavedSearch
+from papistui.features.searchworker import SearchWorker, spinner
+from papistui.features.sorting import insert_sorted, sort_ids
+from papistui.features.store import ids
+from papistui.helpers.frames import frames
+from papistui.helpers.query import rewriter
 from papistui.helpers.styleparser import StyleParser
 
 
 class DocumentList:
-    def __init__(self, items, initsize, stdscr, config):
+    def __init__(self, items, store, initsize, stdscr, config, presorted=False):
         """ Constructor method
 
-        :param items: list of documents to be displayed
+        :param items: array of ids of the documents to be displayed
+        :param store: DocumentStore holding the documents
         :param initsize: dict containing initial size and position
         :param stdscr: curses stdscr (full screen)
         :param config: dict with configuration options
+        :param presorted: bool whether items are already sorted by the default
+            sort keys, defaults to False
         """
 
         self.pad = None
@@ -27,12 +41,43 @@ class DocumentList:
         self.multilinestyle = self.config["documentlist"]["multilinestyle"]["rows"]
         self.mark = self.config["documentlist"]["marked-icon"]
         self.styleheight = len(self.multilinestyle)
+        self.errstyle = self.styleparser.compute_style("red")
+        self.rowcache = RowCache(self.config["documentlist"]["rowcache_size"])
+        self.drawn = None  # what display() put on the pad the last time
 
-        # items
+        # items (as ids of documents in store)
+        self.store = store
         self._items = items
         self.view = items
-        self.marked = []
-        self.selected_doc = self.view[0]
+        self.marked = {}  # ordered set of ids
+        self.query = None  # query the current view is filtered by (if any)
+        # parsed query, matching items and store generation of the last search
+        self.lastmatch = None
+        self.results = None  # array of ids matching the last search
+        self.querycache = QueryCache(
+            self.config["commandline"]["search"]["cache_size"]
+        )
+        self.live = None  # view to return to while a search is typed
+        self.facets = None  # FacetCounts, only built once needed
+        # searches of the configuration whose results are kept
+        self.saved = {
+            name: SavedSearch(name, rewriter.expand(query))
+            for name, query in self.config["commandline"]["search"]["saved"].items()
+        }
+        self.searching = None  # search running in the background
+        self.events = None  # queue.Queue of the tui, needed for searching
+        self.progress = ""  # loading progress passed on to the statusbar
+        # whether searching, sorting and completion ignore accents
+        self.folding = self.config["commandline"]["search"]["ignore_accents"]
+        # the search index is kept in the store (and thus in the snapshot)
+        index_fields = self.config["commandline"]["search"]["index_fields"]
+        if store.index is None or not store.index.compatible(
+            index_fields, folding=self.folding
+        ):
+            store.index = SearchIndex(index_fields, folding=self.folding)
+        store.index.refresh(store)
+        # normalised strings queries are matched against (and sorted by)
+        self.matchtexts = MatchTexts(store, folding=self.folding)
 
         # positions and dimensions
         self._size = initsize
@@ -44,7 +89,7 @@ class DocumentList:
 
         self.init_pad()
         self.sortkeys = self.config["documentlist"]["defaultsort"]
-        if len(self.sortkeys) > 0:
+        if len(self.sortkeys) > 0 and not presorted:
             self.sort(self.sortkeys)
 
     @property
@@ -74,17 +119,185 @@ class DocumentList:
     def items(self, items):
         """ Set items sort (if sortkey present), set view and display
 
-        :param items: list of documents
+        :param items: array of document ids
         """
 
-        if self.sortkeys != "":
-            self._items = sort_multiple_keys(items, self.sortkeys)
+        unfiltered = self.view is self._items
+        self.lastmatch = None
+        self.querycache.clear()
+        for saved in self.saved.values():
+            saved.ordered = False
+        if len(self.sortkeys) > 0:
+            self._items = ids(sort_ids(items, self.sortkeys, self.sortvalue))
         else:
             self._items = items
-        self.view = [item for item in self.items if item in self.view]
+        if unfiltered:
+            self.view = self._items
+        else:
+            inview = set(self.view)
+            self.view = ids(docid for docid in self.items if docid in inview)
         self.bottom = len(self.view)
         self.display()
 
+    def sortvalue(self, docid, key):
+        """ Return value of a field documents are sorted by, without accents
+        and in lower case if accents are ignored
+
+        :param docid: int document id
+        :param key: str field name
+        :return value or None if field is missing
+        """
+
+        value = self.store.get(docid, key)
+        if value is None or not self.folding:
+            return value
+        return self.matchtexts.get(docid, key)[1]
+
+    def complete(self, field, prefix, limit=20):
+        """ Return indexed words of a field starting with prefix, ignoring
+        case (and accents if configured)
+
+        :param field: str field name or None for the match-format string
+        :param prefix: str beginning of the word
+        :param limit: int maximum number of words, defaults to 20
+        :return list of words, those found in most documents first
+        """
+
+        postings = self.store.index.postings.get(field)
+        if postings is None:
+            return []
+
+        prefix = fold(prefix) if self.folding else lower(prefix)
+        words = [word for word in postings if word.startswith(prefix)]
+        words.sort(key=lambda word: -len(postings[word]))
+        return words[:limit]
+
+    @property
+    def selected_doc(self):
+        return self.store.document(self.view[self.selected_idx])
+
+    def documents(self, docids):
+        """ Return documents for ids
+
+        :param docids: iterable of document ids
+        :return list of documents
+        """
+
+        return self.store.documents(docids)
+
+    def extend(self, docs):
+        """ Append documents to items (and view if they match the current view)
+        without sorting. Only redraws if new documents appear on screen.
+
+        :param docs: list of documents
+        """
+
+        unfiltered = self.view is self._items
+        new = self.store.add(docs)
+        self.store.index.refresh(self.store)
+        self._items.extend(new)
+        if not unfiltered and self.query is not None:
+            # the view may be kept elsewhere (search results), so it is copied
+            self.view = self.view + self.matches(new, self.query)
+        if self.bottom < len(self.view):
+            visible = self.bottom < self.top_idx + self.rownr
+            self.bottom = len(self.view)
+            if visible:
+                self.display()
+
+    def select(self, doc, win_idx=None):
+        """ Select document in view (first document if not in view)
+
+        :param doc: document to be selected
+        :param win_idx: int preferred position on screen, defaults to None which
+            keeps the current position
+        """
+
+        try:
+            idx = self.view.index(doc.docid)
+        except ValueError:
+            idx = 0
+        self.select_idx(idx, win_idx)
+
+    def select_idx(self, idx, win_idx=None):
+        """ Select document at index in view
+
+        :param idx: int index of document in view
+        :param win_idx: int preferred position on screen, defaults to None which
+            keeps the current position
+        """
+
+        if win_idx is None:
+            win_idx = self.selected_win_idx
+        win_idx = min(win_idx, idx, self.rownr - 1)
+        self._top_idx = idx - win_idx
+        self.selected_win_idx = win_idx
+
+    def update(self, added=(), modified=(), removed=()):
+        """ Apply changes to items, view and marked documents while keeping the
+        selected document at its position on screen
+
+        :param added: list of new documents
+        :param modified: list of documents whose content changed
+        :param removed: list of documents that no longer exist
+        """
+
+        selected = self.view[self.selected_idx]
+        idx = self.selected_idx
+        unfiltered = self.view is self._items
+        sorting = len(self.sortkeys) > 0
+        inview = set(self.view)
+        self.store.update(modified)
+        self.store.remove(removed)
+        added = list(self.store.add(added))
+        modified = [doc.docid for doc in modified]
+        changed = {*added, *modified}
+        gone = {doc.docid for doc in removed}
+        # modified documents might have to move if items are sorted
+        out = gone | set(modified) if sorting else gone
+
+        if self.query is not None and not unfiltered:
+            matching = set(self.matches([*added, *modified], self.query))
+        else:
+            matching = None
+
+        self._items = ids(docid for docid in self._items if docid not in out)
+        for docid in [*added, *modified] if sorting else added:
+            if sorting:
+                insert_sorted(self._items, docid, self.sortkeys, self.sortvalue)
+            else:
+                self._items.append(docid)
+
+        if unfiltered:
+            self.view = self._items
+        else:
+            # the view keeps its order (e.g. ranked by a search), documents
+            # matching a query are placed like in items
+            moving = set(modified) if sorting and matching is not None else set()
+            self.view = ids(
+                docid
+                for docid in self.view
+                if docid not in gone and docid not in moving
+                and (matching is None or docid not in changed or docid in matching)
+            )
+            for docid in [*added, *modified] if matching is not None else ():
+                if docid in matching and (docid in moving or docid not in inview):
+                    if sorting:
+                        insert_sorted(self.view, docid, self.sortkeys, self.sortvalue)
+                    else:
+                        self.view.append(docid)
+            if len(self.view) == 0:
+                self.query = None
+                self.view = self._items
+
+        for docid in gone:
+            self.marked.pop(docid, None)
+        self.bottom = len(self.view)
+        if selected in gone:
+            self.select_idx(max(0, min(idx, self.bottom - 1)))
+        else:
+            self.select(self.store.document(selected))
+
     @property
     def selected_win_idx(self):
         return self._selected_win_idx
@@ -98,7 +311,6 @@ class DocumentList:
 
         self._selected_win_idx = selected_win_idx
         self.selected_idx = self.top_idx + self._selected_win_idx
-        self.selected_doc = self.view[self.selected_idx]
 
     @property
     def top_idx(self):
@@ -112,7 +324,6 @@ class DocumentList:
         """
         self._top_idx = top_idx
         self.selected_idx = self._top_idx + self.selected_win_idx
-        self.selected_doc = self.view[self.selected_idx]
 
     def init_pad(self):
         """ Setup the pad """
@@ -125,10 +336,18 @@ class DocumentList:
         :return list of document(s)
         """
         if len(self.marked) > 0:
-            return self.marked
+            return self.marked_docs()
         else:
             return [self.selected_doc]
 
+    def marked_docs(self):
+        """ Return marked documents
+
+        :return list of documents
+        """
+
+        return self.documents(self.marked)
+
     def paging(self, direction):
         """ Scroll one page up or down
 
@@ -219,7 +438,9 @@ class DocumentList:
         elif self.style == "table":
             return int(self.size["sizey"]) - 1
 
-    def printtablerow(self, posy, doc=None, header=False, selected=False, marked=False):
+    def printtablerow(
+        self, posy, doc=None, header=False, selected=False, marked=False, screen=None
+    ):
         """ Print single row in table style
 
         :param posy: int vertical position where to print row
@@ -227,7 +448,11 @@ class DocumentList:
         :param header: bool whether row is the header, defaults to False
         :param selected: bool whether current row the selected, defaults to False
         :param marked: boll whether document is in marked, defaults to False
+        :param screen: curses win or pad (or Recorder) where to print, defaults
+            to None which uses the pad
         """
+
+        screen = self.pad if screen is None else screen
         sep = self.config["documentlist"]["tablestyle"]["separator"]
         if header:
             style = self.config["documentlist"]["tablestyle"]["headerstyle"]
@@ -240,7 +465,7 @@ class DocumentList:
         string = self.mark if marked else " "
         xoffset = 2
         self.styleparser.sprintline(
-            screen=self.pad,
+            screen=screen,
             string=string,
             posy=posy,
             xmax=xoffset,
@@ -260,7 +485,7 @@ class DocumentList:
                     else self.size["sizex"] - xoffset - 1
                 )
                 self.styleparser.sprintline(
-                    screen=self.pad,
+                    screen=screen,
                     string=string,
                     posy=posy,
                     xmax=xmax,
@@ -278,7 +503,7 @@ class DocumentList:
                     else self.size["sizex"] - xoffset - 1
                 )
                 self.styleparser.sprintline(
-                    screen=self.pad,
+                    screen=screen,
                     string=sep,
                     posy=posy,
                     xmax=xmax,
@@ -289,56 +514,143 @@ class DocumentList:
                 )
                 xoffset += len(sep)
 
-    def display(self):
-        """ Display documents on window """
+    def printmultilinerow(self, posy, doc, marked=False, screen=None):
+        """ Print single document in multiline style
 
-        self.pad.erase()
-        if self.style == "table":
-            self.printtablerow(header=True, posy=0)
-            for idx, item in enumerate(
-                self.view[self.top_idx : self.top_idx + self.rownr]
-            ):
-                self.printtablerow(
-                    posy=idx + 1,
-                    doc=item,
-                    header=False,
-                    marked=item in self.marked,
-                    selected=idx == self.selected_win_idx,
-                )
+        :param posy: int vertical position of the first line
+        :param doc: document to be displayed
+        :param marked: bool whether document is in marked, defaults to False
+        :param screen: curses win or pad (or Recorder) where to print, defaults
+            to None which uses the pad
+        """
 
-        elif self.style == "multiline":
-            frametop_idx = "╭" + "─" * int(self.size["sizex"] - 2) + "╮"
-            framebottom = "╰" + "─" * int(self.size["sizex"] - 2) + "╯"
-            itemstart = lambda idx: idx * (self.styleheight + 1) + 1  # noqa: E731
-            # draw items
-            for idx, item in enumerate(
-                self.view[self.top_idx : self.top_idx + self.rownr]
-            ):
-                for linenr, line in enumerate(self.multilinestyle):
-                    self.styleparser.printline(
-                        screen=self.pad,
-                        string=line,
-                        posy=itemstart(idx) + linenr,
-                        xmax=self.size["sizex"] - 1,
-                        doc=item,
-                        xoffset=3,
-                        align="left",
-                    )
-
-                if item in self.marked:
-                    self.pad.addstr(itemstart(idx), 1, self.mark, 7)
-            # draw frame
-            self.pad.addstr(itemstart(self.selected_win_idx) - 1, 0, frametop_idx, 7)
-            self.pad.addstr(
-                itemstart(self.selected_win_idx) + self.styleheight, 0, framebottom, 7
+        screen = self.pad if screen is None else screen
+        for linenr, line in enumerate(self.multilinestyle):
+            self.styleparser.printline(
+                screen=screen,
+                string=line,
+                posy=posy + linenr,
+                xmax=self.size["sizex"] - 1,
+                doc=doc,
+                xoffset=3,
+                align="left",
             )
-            for i in range(0, self.styleheight):
-                self.pad.addstr(itemstart(self.selected_win_idx) + i, 0, "│", 7)
-                self.pad.addstr(
-                    itemstart(self.selected_win_idx) + i, self.size["sizex"] - 1, "│", 7
+
+        if marked:
+            screen.addstr(posy, 1, self.mark, 7)
+
+    def printrow(self, posy, docid, selected=False, marked=False):
+        """ Print single document taking its layout from the row cache if possible
+
+        :param posy: int vertical position where to print the document
+        :param docid: int id of the document
+        :param selected: bool whether document is selected, defaults to False
+        :param marked: bool whether document is in marked, defaults to False
+        """
+
+        # the selection is only part of the row in table style
+        selected = selected and self.style == "table"
+        key = (
+            docid,
+            self.store.versions[docid],
+            self.style,
+            self.size["sizex"],
+            selected,
+            marked,
+        )
+        ops = self.rowcache.get(key)
+        if ops is None:
+            recorder = Recorder()
+            doc = self.store.document(docid)
+            if self.style == "table":
+                self.printtablerow(
+                    0, doc=doc, selected=selected, marked=marked, screen=recorder
                 )
+            else:
+                self.printmultilinerow(0, doc, marked=marked, screen=recorder)
+            ops = recorder.ops
+            self.rowcache.put(key, ops)
+
+        replay(self.pad, ops, posy, self.errstyle)
+
+    def rowpos(self, idx):
+        """ Return first line of the document at a position on screen
+
+        :param idx: int position of the document on screen
+        :return int line
+        """
+
+        if self.style == "table":
+            return idx + 1
+        return idx * (self.styleheight + 1) + 1
+
+    def drawframe(self, idx, erase=False):
+        """ Draw (or erase) the frame around the selected document in multiline
+        style
+
+        :param idx: int position of the selected document on screen
+        :param erase: bool whether to remove the frame, defaults to False
+        """
+
+        posy = self.rowpos(idx)
+        sizex = self.size["sizex"]
+        if erase:
+            top, bottom, side = (" " * sizex, " " * sizex, " ")
+            style = 0
+        else:
+            top = "╭" + "─" * int(sizex - 2) + "╮"
+            bottom = "╰" + "─" * int(sizex - 2) + "╯"
+            side = "│"
+            style = 7
+
+        self.pad.addstr(posy - 1, 0, top, style)
+        self.pad.addstr(posy + self.styleheight, 0, bottom, style)
+        for i in range(0, self.styleheight):
+            self.pad.addstr(posy + i, 0, side, style)
+            self.pad.addstr(posy + i, sizex - 1, side, style)
+
+    def display(self):
+        """ Display documents on window
+
+        Only documents that changed since the last call (different document,
+        content, mark or selection) are repainted, as long as the documents on
+        screen did not move. Everything is redrawn otherwise.
+        """
 
-        self.pad.refresh(
+        rows = [
+            (docid, self.store.versions[docid], docid in self.marked)
+            for docid in self.view[self.top_idx : self.top_idx + self.rownr]
+        ]
+        layout = (
+            self.style,
+            self.size["sizey"],
+            self.size["sizex"],
+            self.rownr,
+            self.top_idx,
+            len(rows),
+        )
+
+        drawn = self.drawn
+        if drawn is None or drawn["layout"] != layout:
+            self.redraw(rows)
+        else:
+            dirty = {idx for idx, row in enumerate(rows) if row != drawn["rows"][idx]}
+            moved = drawn["selected"] != self.selected_win_idx
+            if moved and self.style == "table":
+                dirty |= {drawn["selected"], self.selected_win_idx}
+            if self.style == "multiline" and (moved or dirty):
+                self.drawframe(drawn["selected"], erase=True)
+            for idx in dirty:
+                self.repaint(idx, rows[idx])
+            if self.style == "multiline" and (moved or dirty):
+                self.drawframe(self.selected_win_idx)
+
+        self.drawn = {"layout": layout, "rows": rows, "selected": self.selected_win_idx}
+        # other windows might have been drawn over the list in the meantime
+        self.pad.touchwin()
+        frames.refresh(
+            self,
+            self.pad,
             0,
             0,
             self.size["posy"],
@@ -347,10 +659,53 @@ class DocumentList:
             self.size["sizex"] - 1,
         )
 
+    def invalidate(self):
+        """ Draw all documents with the next call of ``display``, e.g. because
+        something else was drawn on the pad """
+
+        self.drawn = None
+
+    def redraw(self, rows):
+        """ Draw all documents on screen
+
+        :param rows: list of tuples (docid, version, marked) to be drawn
+        """
+
+        self.pad.erase()
+        if self.style == "table":
+            self.printtablerow(header=True, posy=0)
+        for idx, (docid, _, marked) in enumerate(rows):
+            self.printrow(
+                self.rowpos(idx),
+                docid,
+                selected=idx == self.selected_win_idx,
+                marked=marked,
+            )
+        if self.style == "multiline":
+            self.drawframe(self.selected_win_idx)
+
+    def repaint(self, idx, row):
+        """ Clear and draw a single document on screen
+
+        :param idx: int position of the document on screen
+        :param row: tuple (docid, version, marked)
+        """
+
+        posy = self.rowpos(idx)
+        height = 1 if self.style == "table" else self.styleheight
+        for y in range(posy, posy + height):
+            self.pad.move(y, 0)
+            self.pad.clrtoeol()
+        self.printrow(
+            posy, row[0], selected=idx == self.selected_win_idx, marked=row[2]
+        )
+
     def refresh(self):
         """ Refresh underlying pad """
 
-        self.pad.refresh(
+        frames.refresh(
+            self,
+            self.pad,
             0,
             0,
             self.size["posy"],
@@ -397,19 +752,18 @@ class DocumentList:
     def mark_selected(self, *args):
         """ Toggle mark on selected document """
 
-        if self.view[self.selected_idx] in self.marked:
-            self.marked.remove(self.view[self.selected_idx])
+        docid = self.view[self.selected_idx]
+        if docid in self.marked:
+            del self.marked[docid]
         else:
-            self.marked.append(self.view[self.selected_idx])
+            self.marked[docid] = None
 
         return {"exit_status": 0}
 
     def mark_view(self, *args):
         """ Mark all documents in current view """
 
-        for i in self.view:
-            if i not in self.marked:
-                self.marked.append(i)
+        self.marked.update(dict.fromkeys(self.view))
 
         return {"exit_status": 0}
 
@@ -418,7 +772,7 @@ class DocumentList:
 
         :return dictionary with exit status
         """
-        self.marked = []
+        self.marked = {}
         return {"exit_status": 0}
 
     def mark_down(self, *args):
@@ -434,6 +788,8 @@ class DocumentList:
     def view_reset(self, *args):
         """ Reset view to see all documents """
 
+        self.cancel_search()
+        self.query = None
         self.view = self.items
         self.bottom = len(self.items)
         return {"exit_status": 0}
@@ -441,9 +797,11 @@ class DocumentList:
     def view_marked(self, *args):
         """ Set view to only those documents currently marked """
 
-        marked = [item for item in self.view if item in self.marked]
+        marked = ids(docid for docid in self.view if docid in self.marked)
         if len(marked) > 0:
+            self.cancel_search()
             self.selected_win_idx = 0
+            self.query = None
             self.view = marked
             self.bottom = len(self.view)
             self.top_idx = 0
@@ -466,30 +824,82 @@ class DocumentList:
             "view": str(len(self.view)),
             "items": str(len(self.items)),
             "sortkeys": " ".join(self.sortkeys),
+            "progress": self.progress + self.search_progress(),
         }
 
-    def docmatch(self, query):
+    def search_progress(self):
+        """ Return spinner and number of matches found so far while searching
+        in the background
+
+        :return str, empty if no search is running
+        """
+
+        if self.searching is None:
+            return ""
+
+        worker = self.searching["worker"]
+        found = len(self.searching["certain"]) + len(worker.results)
+        return f" {spinner()} {found} found"
+
+    def docmatch(self, query, live=False):
         """ Filter documents based on query
 
+        Results are cached, so repeated queries are answered immediately as
+        long as the library did not change. If the query only narrows down the
+        previous one, only the results of the previous search are searched.
+        Searches going through many documents run in the background (see
+        ``search_background``), a running search is cancelled.
+
         :param query: str query to be interpreted by papis docmatch
+        :param live: bool whether the query is still being typed, in which case
+            the view is returned to by ``cancel_live_search``, defaults to False
+        :return dict with exit status
         """
-        try:
-            aliases = self.config["commandline"]["search"]["keyword_aliases"]
-        except KeyError:
-            aliases = []
-
-        for alias in aliases:
-            regex = r"\b" + re.escape(alias) + r"\b"
-            query = re.sub(regex, aliases[alias], query)
-
-        DocMatcher.set_matcher(match_document)
-        DocMatcher.parse(query)
-        self.results = []
-        for item in self.items:
-            if DocMatcher.return_if_match(item) is not None:
-                self.results.append(item)
+        self.cancel_search()
+        query = rewriter.expand(query)
+        parsed = DocMatcher.parse(query)
+        key = normalise(parsed)
+        # documents added or changed since the last search might match as well
+        generation = self.store.generation
+        self.results = self.querycache.get(key, generation)
+        if self.results is None:
+            base = self.items
+            if (
+                self.lastmatch is not None
+                and self.lastmatch[2] == generation
+                and narrows(parsed, self.lastmatch[0])
+            ):
+                base = self.lastmatch[1]
+            docids, uncertain = self.candidates(base, parsed)
+            # searches matched by several processes are fast enough to wait for
+            background = self.config["commandline"]["search"]["background_threshold"]
+            if (
+                not live
+                and self.events is not None
+                and 0 < background <= len(uncertain)
+                and self.processes(len(uncertain)) == 1
+            ):
+                return self.search_background(query, docids, uncertain)
+            self.results = merge(docids, uncertain, self.verify(uncertain, query))
+            self.querycache.put(key, generation, self.results)
+        return self.show_matches(query, parsed, live)
+
+    def show_matches(self, query, parsed, live=False):
+        """ Show results of a search
+
+        :param query: str query the results match
+        :param parsed: list of ParseResult of the query
+        :param live: bool whether the query is still being typed, defaults to
+            False
+        :return dict with exit status
+        """
+
+        self.lastmatch = (parsed, self.results, self.store.generation)
         if len(self.results) > 0:
+            if not live:
+                self.live = None
             self.selected_win_idx = 0
+            self.query = query
             self.view = self.results
             self.bottom = len(self.view)
             self.top_idx = 0
@@ -501,6 +911,321 @@ class DocumentList:
                 "message": ("No matching documents found", "error"),
             }
 
+    def search_background(self, query, docids, uncertain):
+        """ Match documents in the background, results are shown by
+        ``publish`` once the search is done
+
+        :param query: str query (aliases expanded)
+        :param docids: array of candidate ids (see ``candidates``)
+        :param uncertain: list of candidate ids that have to be matched
+        :return dict with exit status
+        """
+
+        predicate = compile_query(DocMatcher.parse(query), self.matchtexts)
+        worker = SearchWorker(uncertain, predicate, self.events)
+        uncertain_ids = set(uncertain)
+        self.searching = {
+            "worker": worker,
+            "query": query,
+            "generation": self.store.generation,
+            "docids": docids,
+            "uncertain": uncertain,
+            # candidates known to match without checking
+            "certain": [docid for docid in docids if docid not in uncertain_ids],
+        }
+        worker.start()
+        return {"exit_status": 0, "message": ("Searching...", "neutral")}
+
+    def publish(self, worker):
+        """ Show results of a background search if they are still current,
+        i.e. the search was neither cancelled nor replaced by another one
+
+        :param worker: SearchWorker that finished
+        :return dict with exit status or None if results are outdated
+        """
+
+        searching = self.searching
+        if searching is None or searching["worker"] is not worker:
+            return None
+
+        self.searching = None
+        if searching["generation"] != self.store.generation:
+            # documents changed while searching, which the results might miss
+            return self.docmatch(searching["query"])
+
+        parsed = DocMatcher.parse(searching["query"])
+        self.results = merge(
+            searching["docids"], searching["uncertain"], worker.results
+        )
+        self.querycache.put(normalise(parsed), searching["generation"], self.results)
+        return self.show_matches(searching["query"], parsed)
+
+    def cancel_search(self):
+        """ Cancel search running in the background
+
+        :return bool whether a search was running
+        """
+
+        if self.searching is None:
+            return False
+
+        self.searching["worker"].cancel()
+        self.searching = None
+        return True
+
+    def fuzzy(self, query):
+        """ Show documents similar to query, best matches first
+
+        :param query: str (possibly misspelled) words to look for
+        :return dict with exit status
+        """
+
+        search = self.config["commandline"]["search"]
+        index = self.store.trigrams
+        if index is None or not index.compatible(search["fuzzy_fields"]):
+            index = self.store.trigrams = TrigramIndex(search["fuzzy_fields"])
+        # building the index takes its share of the budget, indexing goes on
+        # with the next search where it stopped
+        budget = search["fuzzy_budget"]
+        start = time.perf_counter()
+        built = index.refresh(self.store, start + budget)
+        budget = max(budget - (time.perf_counter() - start), 0)
+
+        ranked, complete = index.search(self.store, query, budget)
+        if not built:
+            message = "Index for fuzzy search is still being built, search again"
+        else:
+            message = "Search took too long, results may be incomplete"
+        if len(ranked) == 0:
+            if built:
+                message = "No matching documents found"
+            return {"exit_status": 2, "message": (message, "error")}
+
+        self.show_ranked(ranked)
+        if not built or not complete:
+            return {"exit_status": 0, "message": (message, "neutral")}
+        return {"exit_status": 0}
+
+    def show_ranked(self, docids):
+        """ Show documents in the given order, e.g. ranked by a search
+
+        :param docids: list of document ids, best match first
+        """
+
+        self.cancel_search()
+        self.query = None
+        self.view = ids(docids)
+        self.bottom = len(self.view)
+        self.jump_to_top()
+        self.display()
+
+    def show_saved(self, name):
+        """ Show results of a saved search
+
+        Results are searched for once and then kept up to date: only documents
+        added, changed or removed since they were last shown are matched
+        again.
+
+        :param name: str name of the saved search
+        :return dict with exit status
+        """
+
+        saved = self.saved.get(name)
+        if saved is None:
+            names = ", ".join(self.saved) or "none configured"
+            return {
+                "exit_status": 2,
+                "message": (f"Unknown saved search {name} ({names})", "error"),
+            }
+
+        self.cancel_search()
+        if saved.ids is None:
+            saved.materialise(self.store, self.items, self.matches)
+        else:
+            place = self.place if len(self.sortkeys) > 0 else None
+            saved.refresh(self.store, self.matches, place)
+        if not saved.ordered:
+            saved.reorder(self.items)
+        if len(saved.ids) == 0:
+            return {
+                "exit_status": 2,
+                "message": (f"No documents match saved search {name}", "error"),
+            }
+
+        self.live = None
+        self.query = saved.query
+        self.view = saved.ids
+        self.bottom = len(self.view)
+        self.jump_to_top()
+        self.display()
+        return {"exit_status": 0}
+
+    def facet_counts(self):
+        """ Return number of documents in view having each value of the
+        configured facet fields
+
+        :return dict mapping field names to Counter of values
+        """
+
+        fields = self.config["facets"]["fields"]
+        if self.facets is None or not self.facets.index.compatible(fields):
+            self.facets = FacetCounts(FacetIndex(fields))
+        self.facets.index.refresh(self.store)
+        return self.facets.update(self.view, self.store.generation)
+
+    def facet(self, field, value):
+        """ Narrow view down to documents having a value in a facet field
+
+        Documents are looked up in the facet index, so they do not have to be
+        matched.
+
+        :param field: str field name
+        :param value: str value, compared ignoring case unless found as given
+        :return dict with exit status
+        """
+
+        if field not in self.config["facets"]["fields"]:
+            fields = ", ".join(self.config["facets"]["fields"])
+            return {
+                "exit_status": 2,
+                "message": (f"{field} is not a facet field ({fields})", "error"),
+            }
+
+        self.facet_counts()
+        docids = self.facets.index.lookup(field, value)
+        view = ids(docid for docid in self.view if docid in docids)
+        if len(view) == 0:
+            return {
+                "exit_status": 2,
+                "message": (f"No documents in view with {field} {value}", "error"),
+            }
+
+        self.cancel_search()
+        self.live = None
+        self.query = None
+        self.view = view
+        self.bottom = len(self.view)
+        self.jump_to_top()
+        self.display()
+        return {"exit_status": 0}
+
+    def place(self, docids, docid):
+        """ Insert id of a document into sorted ids at its position
+
+        :param docids: array of document ids sorted by the current sort keys
+        :param docid: int document id
+        """
+
+        insert_sorted(docids, docid, self.sortkeys, self.sortvalue)
+
+    def search_live(self, query):
+        """ Show documents matching a query while it is being typed
+
+        :param query: str (incomplete) query to be interpreted by papis docmatch
+        """
+
+        if self.live is None:
+            selected = self.view[self.selected_idx] if len(self.view) > 0 else None
+            self.live = {"view": self.view, "query": self.query, "selected": selected}
+        if query.strip() == "":
+            self.restore_view(self.live)
+        else:
+            self.docmatch(query, live=True)
+
+    def cancel_live_search(self):
+        """ Return to the view shown before a search was typed unless the
+        search was applied """
+
+        if self.live is not None:
+            self.restore_view(self.live)
+            self.live = None
+
+    def restore_view(self, live):
+        """ Show a view saved by ``search_live``
+
+        :param live: dict with view, query and selected document id
+        """
+
+        self.query = live["query"]
+        self.view = live["view"]
+        self.bottom = len(self.view)
+        if live["selected"] is None:
+            self.jump_to_top()
+        else:
+            self.select(self.store.document(live["selected"]), win_idx=0)
+        self.display()
+
+    def matches(self, docids, query):
+        """ Return ids of documents matching query
+
+        :param docids: iterable of document ids
+        :param query: str query to be interpreted by papis docmatch
+        :return array of ids of matching documents
+        """
+
+        docids, uncertain = self.candidates(docids, DocMatcher.parse(query))
+        return merge(docids, uncertain, self.verify(uncertain, query))
+
+    def candidates(self, docids, parsed):
+        """ Narrow down documents that may match a query using the search
+        index
+
+        :param docids: iterable of document ids
+        :param parsed: list of ParseResult as returned by ``DocMatcher.parse``
+        :return tuple (array of candidate ids, list of candidate ids that have
+            to be checked by papis' matcher)
+        """
+
+        index = self.store.index
+        index.refresh(self.store)
+        candidates, exact = index.search(parsed)
+        if candidates is None:
+            docids = ids(docids)
+            return docids, docids
+
+        # candidates are checked by papis' matcher unless known to match
+        uncertain = index.dirty if exact else candidates
+        docids = ids(docid for docid in docids if docid in candidates)
+        return docids, [docid for docid in docids if docid in uncertain]
+
+    def verify(self, docids, query):
+        """ Return ids of documents matched by papis' matcher
+
+        The query is compiled into a predicate giving the same results as
+        papis' matcher (see ``compile_query``). Many documents are matched by
+        several processes, if configured.
+
+        :param docids: list or array of document ids
+        :param query: str query to be interpreted by papis docmatch
+        :return array of ids of matching documents
+        """
+
+        processes = self.processes(len(docids))
+        if processes > 1:
+            return parallel_matches(
+                self.matchtexts, docids, query, processes, self.store.generation
+            )
+
+        predicate = compile_query(DocMatcher.parse(query), self.matchtexts)
+        return ids(filter(predicate, docids))
+
+    def processes(self, count):
+        """ Return number of processes to match documents with
+
+        :param count: int number of documents to be matched
+        :return int, 1 if documents are matched by this process
+        """
+
+        search = self.config["commandline"]["search"]
+        threshold = search["parallel_threshold"]
+        if threshold > 0 and count >= threshold:
+            processes = workers(search["parallel_workers"])
+            if processes > 1 and ready(
+                self.matchtexts, processes, self.store.generation
+            ):
+                return processes
+        return 1
+
     def sort(self, sortkeys):
         """ Set sort string and reset view
 
@@ -510,3 +1235,29 @@ class DocumentList:
         self.items = self.items
         self.jump_to_top()
         return {"exit_status": 0}
+
+    def resort(self):
+        """ Sort items by current sort keys keeping the selected document """
+
+        doc = self.selected_doc
+        self.items = self.items
+        self.select(doc)
+
+
+def merge(docids, uncertain, matching):
+    """ Return candidates of a search that match
+
+    :param docids: array of candidate ids
+    :param uncertain: list of the candidates that had to be checked
+    :param matching: array of the checked candidates that match
+    :return array of ids of matching documents
+    """
+
+    if uncertain is docids:
+        return matching
+
+    uncertain = set(uncertain)
+    matching = set(matching)
+    return ids(
+        docid for docid in docids if docid not in uncertain or docid in matching
+    )
@@ -1,8 +1,14 @@
 import curses
 from itertools import cycle
 
+from papistui.helpers.frames import frames
 from papistui.helpers.styleparser import StyleParser
 
+# view showing snippets of the full text search
+SNIPPET_VIEW = "fulltext"
+# view showing value counts of the facet fields
+FACET_VIEW = "facets"
+
 
 class InfoWindow:
     def __init__(self, stdscr, config):
@@ -18,12 +24,14 @@ class InfoWindow:
         self.pad = None
         self._size = {"sizey": 0, "sizex": 0, "posy": 0, "posx": 0}
         self._yscroll = 0
+        self.snippets = {}  # document id -> snippet of full text search
 
         try:
             # check if config file has views section
             self.views = self.config["infowindow"]["views"]
             self.enabled = True
         except KeyError:
+            self.views = {}
             self.enabled = False
 
         if self.enabled:
@@ -36,6 +44,55 @@ class InfoWindow:
                 self.views[view].setdefault("linewrap", True)
                 self.views[view].setdefault("align", "left")
 
+    def show_snippets(self, snippets):
+        """Show snippets of a full text search, adding a view for them
+
+        :param snippets: dict mapping document ids to snippets
+        """
+        self.snippets = snippets
+        self.show_view(SNIPPET_VIEW, self.config["fulltext"]["snippet_height"])
+
+    def show_facets(self):
+        """Show value counts of the facet fields, adding a view for them"""
+        self.show_view(FACET_VIEW, self.config["facets"]["height"])
+
+    def show_view(self, view, height):
+        """Show a view that is not part of the configuration, adding it to
+        the views if necessary
+
+        :param view: str name of the view
+        :param height: int height of the view
+        """
+        if view not in self.views:
+            self.views[view] = {
+                "content": "",
+                "height": height,
+                "linewrap": True,
+                "align": "left",
+            }
+            self.viewnames = list(self.views)
+            self.iterview = cycle(self.views)
+            self.enabled = True
+        self.view = view
+        self._yscroll = 0
+        self.active = True
+        self._size = {"sizey": self.views[self.view]["height"] + 2}
+
+    def facet_lines(self):
+        """Return one line per facet field listing its most frequent values
+        in the current view
+
+        :return list of str
+        """
+        limit = self.config["facets"]["limit"]
+        return [
+            f"{field}: "
+            + "  ".join(
+                f"{value} ({count})" for value, count in counter.most_common(limit)
+            )
+            for field, counter in self.doclist.facet_counts().items()
+        ]
+
     @property
     def yscroll(self):
         return self._yscroll
@@ -72,7 +129,9 @@ class InfoWindow:
         self.active = False
         if self.pad:
             self.pad.erase()
-            self.pad.refresh(
+            frames.refresh(
+                self,
+                self.pad,
                 0,
                 0,
                 self.size["posy"],
@@ -137,6 +196,11 @@ class InfoWindow:
         self.pad.erase()
         info = self.views[self.view]["content"]
         doc = self.doclist.selected_doc
+        plain = self.view in (SNIPPET_VIEW, FACET_VIEW)
+        if self.view == SNIPPET_VIEW:
+            info = self.snippets.get(doc.docid, "No full text match")
+        elif self.view == FACET_VIEW:
+            info = self.facet_lines()
         x = self.styleparser.printline(
             screen=self.pad,
             string=info,
@@ -148,11 +212,14 @@ class InfoWindow:
             align="left",
             doc=doc,
             wraplines=self.views[self.view]["linewrap"],
-            evaluate=True,
+            evaluate=not plain,
+            parse=not plain,
         )
         self._yscroll = x["yscroll"]
         self.draw_border()
-        self.pad.refresh(
+        frames.refresh(
+            self,
+            self.pad,
             0,
             0,
             self.size["posy"],
@@ -1,5 +1,6 @@
 import curses
 
+from papistui.helpers.frames import frames
 from papistui.helpers.styleparser import StyleParser
 
 
@@ -63,4 +64,6 @@ class KeyInfo:
             )
 
         self.win.overlay(doclist.pad)
-        self.win.refresh()
+        # the hints are copied onto the pad, where only a full redraw removes them
+        doclist.invalidate()
+        frames.refresh(self, self.win)
@@ -1,5 +1,6 @@
 import curses
 
+from papistui.helpers.frames import frames
 from papistui.helpers.styleparser import StyleParser
 
 
@@ -21,7 +22,9 @@ class MessageBar:
 
         if self.pad:
             self.pad.erase()
-            self.pad.refresh(
+            frames.refresh(
+                self,
+                self.pad,
                 0,
                 0,
                 self.size["posy"],
@@ -59,7 +62,9 @@ class MessageBar:
             xoffset=0,
             fill=True,
         )
-        self.pad.refresh(
+        frames.refresh(
+            self,
+            self.pad,
             0,
             0,
             self.size["posy"],
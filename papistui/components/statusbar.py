@@ -1,5 +1,6 @@
 import curses
 
+from papistui.helpers.frames import frames
 from papistui.helpers.styleparser import StyleParser
 
 
@@ -76,7 +77,9 @@ class StatusBar:
             xoffset=0,
             align="right",
         )
-        self.pad.refresh(
+        frames.refresh(
+            self,
+            self.pad,
             0,
             0,
             self.size["posy"],
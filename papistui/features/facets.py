@@ -0,0 +1,176 @@
+from collections import Counter
+
+# fields holding several names joined by "and", as in BibTeX
+NAME_FIELDS = {"author", "editor"}
+
+
+def facet_values(value, field):
+    """ Return the values a document is counted under for a field
+
+    Lists (e.g. tags, kept as tuples by the ``DocumentStore``) count once for
+    every element, authors and editors once for every name.
+
+    :param value: value of the field in the document (None if missing)
+    :param field: str field name
+    :return tuple of str values, empty if the field is missing or empty
+    """
+
+    if value is None:
+        return ()
+    if isinstance(value, (list, tuple)):
+        values = [str(element).strip() for element in value]
+    elif field in NAME_FIELDS:
+        values = [name.strip() for name in str(value).split(" and ")]
+    else:
+        values = [str(value).strip()]
+    return tuple(dict.fromkeys(value for value in values if value))
+
+
+class FacetIndex:
+    def __init__(self, fields):
+        """ Constructor method
+
+        Maps the values of document fields (see ``facet_values``) to the ids of
+        the documents having them, and every document to its values. The index
+        follows the changes of a ``DocumentStore`` (see ``refresh``).
+
+        :param fields: list of field names
+        """
+
+        self.fields = tuple(fields)
+        self.values = {field: {} for field in self.fields}  # id -> values
+        self.postings = {field: {} for field in self.fields}  # value -> ids
+        self.size = 0  # number of store ids that were indexed
+        self.logpos = 0  # number of entries of the store log that were applied
+
+    def compatible(self, fields):
+        """ Check whether index was built for the given fields
+
+        :param fields: list of field names
+        :return bool
+        """
+
+        return self.fields == tuple(fields)
+
+    def refresh(self, store):
+        """ Index documents added to, changed in or removed from the store since
+        the last call
+
+        :param store: DocumentStore holding the documents
+        :return bool whether any document changed
+        """
+
+        changed = {*range(self.size, len(store.folders)), *store.log[self.logpos :]}
+        self.size = len(store.folders)
+        self.logpos = len(store.log)
+        for docid in changed:
+            self.remove(docid)
+            if store.folders[docid] is not None:
+                self.add(store, docid)
+        return len(changed) > 0
+
+    def add(self, store, docid):
+        """ Add values of a document to the index
+
+        :param store: DocumentStore holding the document
+        :param docid: int id of the document
+        """
+
+        for field in self.fields:
+            values = facet_values(store.get(docid, field), field)
+            if values:
+                self.values[field][docid] = values
+                postings = self.postings[field]
+                for value in values:
+                    postings.setdefault(value, set()).add(docid)
+
+    def remove(self, docid):
+        """ Remove values of a document from the index
+
+        :param docid: int id of the document
+        """
+
+        for field in self.fields:
+            postings = self.postings[field]
+            for value in self.values[field].pop(docid, ()):
+                postings[value].discard(docid)
+                if not postings[value]:
+                    del postings[value]
+
+    def lookup(self, field, value):
+        """ Return ids of documents having a value, which is compared ignoring
+        case unless it is found as given
+
+        :param field: str field name
+        :param value: str value
+        :return set of document ids, empty if no document has the value
+        """
+
+        postings = self.postings[field]
+        if value in postings:
+            return postings[value]
+        value = value.casefold()
+        for other, docids in postings.items():
+            if other.casefold() == value:
+                return docids
+        return set()
+
+
+class FacetCounts:
+    def __init__(self, index):
+        """ Constructor method
+
+        Number of documents of a view having each value of the fields of a
+        ``FacetIndex``. When the view narrows (e.g. by selecting a value), the
+        documents that left it are subtracted instead of counting the whole
+        view again.
+
+        :param index: FacetIndex the values are taken from
+        """
+
+        self.index = index
+        self.view = None  # view the counts belong to
+        self.members = set()  # ids of the documents in that view
+        self.generation = None  # store generation the counts belong to
+        self.counts = {field: Counter() for field in index.fields}
+
+    def update(self, view, generation):
+        """ Count values of the documents in a view
+
+        :param view: array of document ids
+        :param generation: int store generation, the view is counted again once
+            documents changed
+        :return dict mapping field names to Counter of values
+        """
+
+        if view is self.view and generation == self.generation:
+            return self.counts
+
+        members = set(view)
+        gone = None
+        if generation == self.generation and members <= self.members:
+            gone = self.members - members
+        if gone is None or len(gone) > len(members):
+            self.counts = {
+                field: Counter(
+                    value
+                    for docid in members
+                    for value in self.index.values[field].get(docid, ())
+                )
+                for field in self.index.fields
+            }
+        else:
+            for field, counter in self.counts.items():
+                values = self.index.values[field]
+                subtracted = [
+                    value for docid in gone for value in values.get(docid, ())
+                ]
+                counter.subtract(subtracted)
+                for value in set(subtracted):
+                    if counter[value] <= 0:
+                        del counter[value]
+
+        self.view = view
+        self.members = members
+        self.generation = generation
+        return self.counts
@@ -0,0 +1,298 @@
+import os
+import re
+import shlex
+import sqlite3
+import subprocess
+import threading
+
+import papis.config
+
+# attachments read as they are
+TEXT_TYPES = {"txt", "md", "tex", "org", "rst"}
+
+# operators of FTS5 queries left as they are by phrase_query
+OPERATORS = {"AND", "OR", "NOT"}
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS files (
+        id INTEGER PRIMARY KEY, path TEXT UNIQUE, folder TEXT, mtime REAL
+    )""",
+    "CREATE INDEX IF NOT EXISTS files_folder ON files (folder)",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS content USING fts5(
+        text, tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+]
+
+
+def fulltext_file_name(config):
+    """ Return path of the full text index for the configured library
+
+    :param config: dict configuration options
+    :return str path
+    """
+
+    if config["fulltext"].get("file"):
+        return os.path.expanduser(config["fulltext"]["file"])
+
+    library = re.sub(r"[^\w.-]", "_", str(config["base"]["library"]))
+    return os.path.join(
+        papis.config.get_config_folder(), f"papistui-{library}.fulltext"
+    )
+
+
+def extract(path, extractors):
+    """ Return the text of an attached file
+
+    :param path: str path of the file
+    :param extractors: dict mapping file extensions to commands printing the
+        text of a file (``{file}`` is replaced by its path)
+    :return str text, "" if extraction failed or None if the file type is not
+        supported or the command is not available
+    """
+
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension in TEXT_TYPES:
+        try:
+            with open(path, errors="replace") as f:
+                return f.read()
+        except OSError:
+            return ""
+
+    command = extractors.get(extension)
+    if not command:
+        return None
+
+    args = [arg.replace("{file}", path) for arg in shlex.split(command)]
+    try:
+        result = subprocess.run(
+            args, capture_output=True, timeout=120, check=False
+        )
+    except FileNotFoundError:
+        return None
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    if result.returncode != 0:
+        return ""
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+def attachments(store):
+    """ Return attached files of all documents in the store
+
+    :param store: DocumentStore holding the documents
+    :return list of tuples (main folder, list of absolute paths of files)
+    """
+
+    result = []
+    for docid, folder in enumerate(store.folders):
+        if folder is not None:
+            files = store.get(docid, "files") or []
+            if isinstance(files, str):
+                files = [files]
+            result.append((folder, [os.path.join(folder, f) for f in files]))
+    return result
+
+
+def phrase_query(words):
+    """ Turn words of a command into an FTS5 query
+
+    Every word is quoted, so that characters with a meaning in FTS5 queries
+    (e.g. ``-``, ``:``, ``+`` or ``"``) are looked for as they are, and words
+    containing spaces (quoted on the command line) are looked for as phrases.
+    Only the operators ``AND``, ``OR`` and ``NOT`` as well as a ``*`` ending a
+    word (prefix query) keep their meaning.
+
+    :param words: list of str
+    :return str query
+    """
+
+    terms = []
+    for word in words:
+        if word in OPERATORS:
+            terms.append(word)
+            continue
+        prefix = "*" if len(word) > 1 and word.endswith("*") else ""
+        if prefix:
+            word = word[:-1]
+        terms.append('"{}"{}'.format(word.replace('"', '""'), prefix))
+    return " ".join(terms)
+
+
+class FulltextIndex:
+    def __init__(self, path):
+        """ Constructor method
+
+        SQLite FTS5 index of the text of attached files, kept on disk. Files are
+        recorded with the document folder they belong to and their
+        modification time, so that only files that changed have to be read
+        again. Raises sqlite3.Error if the database can not be opened or
+        SQLite lacks FTS5.
+
+        :param path: str path of the database file
+        """
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=10)
+        try:
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            with self.connection:
+                for statement in SCHEMA:
+                    self.connection.execute(statement)
+        except sqlite3.Error:
+            # e.g. SQLite built without FTS5
+            self.connection.close()
+            raise
+
+    def close(self):
+        self.connection.close()
+
+    def files(self):
+        """ Return modification times of indexed files
+
+        :return dict mapping paths to modification times
+        """
+
+        return dict(self.connection.execute("SELECT path, mtime FROM files"))
+
+    def store(self, folder, path, mtime, text):
+        """ Add or replace the text of a file
+
+        :param folder: str main folder of the document the file belongs to
+        :param path: str path of the file
+        :param mtime: float modification time of the file
+        :param text: str text of the file
+        """
+
+        with self.connection:
+            row = self.connection.execute(
+                "SELECT id FROM files WHERE path = ?", (path,)
+            ).fetchone()
+            if row is None:
+                fileid = self.connection.execute(
+                    "INSERT INTO files (path, folder, mtime) VALUES (?, ?, ?)",
+                    (path, folder, mtime),
+                ).lastrowid
+            else:
+                fileid = row[0]
+                self.connection.execute(
+                    "UPDATE files SET folder = ?, mtime = ? WHERE id = ?",
+                    (folder, mtime, fileid),
+                )
+                self.connection.execute(
+                    "DELETE FROM content WHERE rowid = ?", (fileid,)
+                )
+            self.connection.execute(
+                "INSERT INTO content (rowid, text) VALUES (?, ?)", (fileid, text)
+            )
+
+    def remove(self, paths):
+        """ Remove files from the index
+
+        :param paths: iterable of str paths
+        """
+
+        with self.connection:
+            for path in paths:
+                row = self.connection.execute(
+                    "SELECT id FROM files WHERE path = ?", (path,)
+                ).fetchone()
+                if row is not None:
+                    self.connection.execute(
+                        "DELETE FROM content WHERE rowid = ?", (row[0],)
+                    )
+                    self.connection.execute(
+                        "DELETE FROM files WHERE id = ?", (row[0],)
+                    )
+
+    def search(self, query, limit=500):
+        """ Find documents whose files match a query
+
+        Raises sqlite3.OperationalError if the query is not valid FTS5 syntax.
+
+        :param query: str FTS5 query
+        :param limit: int maximum number of files matched, defaults to 500
+        :return dict mapping document folders to a snippet of their best
+            matching file, best match first
+        """
+
+        rows = self.connection.execute(
+            """SELECT files.folder, snippet(content, 0, '', '', '...', 24)
+            FROM content JOIN files ON files.id = content.rowid
+            WHERE content MATCH ? ORDER BY rank LIMIT ?""",
+            (query, limit),
+        )
+        results = {}
+        for folder, snippet in rows:
+            results.setdefault(folder, " ".join(snippet.split()))
+        return results
+
+
+class FulltextIndexer(threading.Thread):
+    def __init__(self, path, documents, extractors, events):
+        """ Constructor method
+
+        Brings the full text index up to date in a background thread: the text
+        of new and changed attachments is extracted, files that no longer
+        belong to any of the documents are removed. Puts ``("fulltext",
+        indexer)`` into the events queue once done, even if indexing failed
+        (see ``error``). Progress can be followed through the ``done`` and
+        ``total`` attributes.
+
+        :param path: str path of the database file
+        :param documents: list of tuples (main folder, list of paths of
+            attached files) as returned by ``attachments``
+        :param extractors: dict mapping file extensions to commands (see
+            ``extract``)
+        :param events: queue.Queue where the event is put
+        """
+
+        super().__init__(daemon=True)
+        self.path = path
+        self.documents = documents
+        self.extractors = extractors
+        self.events = events
+        self.stopped = threading.Event()
+        self.done = 0
+        self.total = len(documents)
+        self.extracted = 0
+        self.error = None  # str message if the index could not be used
+
+    def stop(self):
+        """ Stop indexing after the current file """
+        self.stopped.set()
+
+    def run(self):
+        try:
+            self.index()
+        except sqlite3.Error as e:
+            self.error = str(e)
+        finally:
+            self.events.put(("fulltext", self))
+
+    def index(self):
+        """ Extract text of new and changed files """
+
+        index = FulltextIndex(self.path)
+        try:
+            known = index.files()
+            seen = set()
+            for folder, paths in self.documents:
+                if self.stopped.is_set():
+                    return
+                for path in paths:
+                    seen.add(path)
+                    try:
+                        mtime = os.stat(path).st_mtime
+                    except OSError:
+                        continue
+                    if known.get(path) == mtime:
+                        continue
+                    text = extract(path, self.extractors)
+                    if text is not None:
+                        index.store(folder, path, mtime, text)
+                        self.extracted += 1
+                self.done += 1
+
+            index.remove(set(known) - seen)
+        finally:
+            index.close()
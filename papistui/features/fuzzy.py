@@ -0,0 +1,223 @@
+import re
+import sys
+import time
+from collections import Counter
+from itertools import chain, repeat
+
+from papistui.features.store import ids
+
+WORD = re.compile(r"\w+")
+# similarities of words are counted in steps of 1 / STEPS, which allows adding up
+# scores of documents by counting their ids
+STEPS = 10
+
+
+def words(text):
+    """ Return the distinct lower case words of a string
+
+    :param text: str
+    :return set of str
+    """
+
+    return set(WORD.findall(text.lower()))
+
+
+def trigrams(word):
+    """ Return the character trigrams of a word
+
+    The word is padded (two spaces in front, one behind) so that short words
+    and the beginning of words get trigrams of their own.
+
+    :param word: str
+    :return set of str trigrams
+    """
+
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    def __init__(self, fields):
+        """ Constructor method
+
+        Index used to rank documents by their similarity to a query. Words of
+        the query are compared to the words of the documents by the character
+        trigrams they share, so that misspelled words still find the words they
+        were meant to be. The index therefore maps words to the documents
+        containing them and trigrams to the words containing them.
+
+        Like ``SearchIndex`` it follows the changes of a ``DocumentStore`` (see
+        ``refresh``) and can be stored along with it.
+
+        :param fields: list of field names to be indexed
+        """
+
+        self.fields = tuple(fields)
+        self.words = {}  # word -> ids of documents containing it
+        self.grams = {}  # trigram -> words containing it
+        self.lengths = ids()  # id -> number of distinct words of the document
+        self.logpos = 0  # number of entries of the store log that were applied
+        # documents that changed after they were indexed and may still be
+        # listed under words they no longer contain
+        self.dirty = set()
+
+    def compatible(self, fields):
+        """ Check whether index was built for the given fields
+
+        :param fields: list of field names
+        :return bool
+        """
+
+        return self.fields == tuple(fields)
+
+    def text(self, store, docid):
+        """ Return the indexed text of a document
+
+        :param store: DocumentStore holding the document
+        :param docid: int id of the document
+        :return str
+        """
+
+        return " ".join(str(store.get(docid, field, "")) for field in self.fields)
+
+    def refresh(self, store, deadline=None):
+        """ Index documents added to or changed in the store since the last call
+
+        :param store: DocumentStore the index belongs to
+        :param deadline: float ``time.perf_counter`` value after which indexing
+            stops, to be continued by the next call, defaults to None (no limit)
+        :return bool whether all documents were indexed
+        """
+
+        size = len(self.lengths)
+        for docid in range(size, len(store.folders)):
+            if deadline is not None and time.perf_counter() > deadline:
+                return False
+            self.lengths.append(0)
+            if store.folders[docid] is not None:
+                self.add(store, docid)
+
+        # documents indexed above are up to date already
+        changed = set()
+        while self.logpos < len(store.log):
+            if deadline is not None and time.perf_counter() > deadline:
+                return False
+            docid = store.log[self.logpos]
+            self.logpos += 1
+            if docid >= size or docid in changed or store.folders[docid] is None:
+                continue
+            changed.add(docid)
+            self.add(store, docid)
+            self.dirty.add(docid)
+
+        return True
+
+    def add(self, store, docid):
+        """ Add words of a document to the index
+
+        :param store: DocumentStore holding the document
+        :param docid: int id of the document
+        """
+
+        found = words(self.text(store, docid))
+        self.lengths[docid] = len(found)
+        for word in found:
+            docids = self.words.get(word)
+            if docids is None:
+                word = sys.intern(word)
+                self.words[word] = ids((docid,))
+                for gram in trigrams(word):
+                    self.grams.setdefault(gram, []).append(word)
+            else:
+                docids.append(docid)
+
+    def similar(self, word, threshold, deadline=None):
+        """ Return indexed words similar to word
+
+        :param word: str lower case word
+        :param threshold: float minimum similarity (shared trigrams divided by
+            all trigrams of both words)
+        :param deadline: float ``time.perf_counter`` value after which words are
+            no longer compared, defaults to None (no limit)
+        :return list of tuples (similarity in steps, word), most similar first,
+            None if the deadline passed before all words were compared
+        """
+
+        grams = trigrams(word)
+        counts = Counter()
+        for gram in grams:
+            if deadline is not None and time.perf_counter() > deadline:
+                return None
+            counts.update(self.grams.get(gram, ()))
+
+        result = []
+        for other, shared in counts.items():
+            similarity = shared / (len(grams) + len(other) + 1 - shared)
+            if similarity >= threshold:
+                result.append((round(similarity * STEPS), other))
+        result.sort(reverse=True)
+        return result
+
+    def search(self, store, query, budget=0.05, threshold=0.3, limit=500):
+        """ Rank documents by how similar their words are to the query's words
+
+        A document scores the similarity of its most similar word for each word
+        of the query. Query words are processed from the one found in the
+        fewest documents to the most common one. Once the time budget is used
+        up, the remaining (least telling) words and similar words are skipped,
+        as are words whose similar words were not found in time.
+
+        :param store: DocumentStore the index belongs to
+        :param query: str
+        :param budget: float seconds to spend on finding similar words and
+            scoring documents, defaults to 0.05
+        :param threshold: float minimum similarity of words, defaults to 0.3
+        :param limit: int maximum number of documents returned, defaults to 500
+        :return tuple (list of document ids, best match first, bool whether all
+            words of the query were taken into account)
+        """
+
+        deadline = time.perf_counter() + budget
+        query = words(query)
+        candidates = []
+        for word in query:
+            similar = self.similar(word, threshold, deadline)
+            if similar is None:
+                break
+            postings = sum(len(self.words[other]) for _, other in similar)
+            candidates.append((postings, similar))
+        candidates.sort(key=lambda candidate: candidate[0])
+
+        scores = Counter()
+        scored = 0
+        for _, similar in candidates:
+            used = []
+            for similarity, other in similar:
+                if time.perf_counter() > deadline:
+                    break
+                used.append((similarity, self.words[other]))
+            # most similar words last, so that their similarity is kept
+            best = {}
+            for similarity, docids in reversed(used):
+                best.update(dict.fromkeys(docids, similarity))
+            # count each document as often as its similarity
+            scores.update(chain.from_iterable(map(repeat, best, best.values())))
+            if len(used) < len(similar):
+                break
+            scored += 1
+
+        # documents changed since they were indexed are scored anew
+        for docid in self.dirty & scores.keys():
+            current = words(self.text(store, docid))
+            scores[docid] = sum(
+                max((s for s, other in similar if other in current), default=0)
+                for _, similar in candidates[:scored]
+            )
+
+        # documents with the same score are ranked by their number of words
+        ranked = sorted(
+            (-score, self.lengths[docid], docid)
+            for docid, score in scores.most_common(limit)
+            if score > 0 and store.folders[docid] is not None
+        )
+        return [docid for _, _, docid in ranked], scored == len(query)
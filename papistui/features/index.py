@@ -0,0 +1,181 @@
+import sys
+
+import papis.config
+import papis.format
+from papistui.features.predicate import fold, lower
+from papistui.features.store import ids
+
+
+def tokens(text, folding=False):
+    """ Return normalised tokens of the part of a string papis docmatch matches
+
+    The patterns built by papis docmatch (``.*word.*``) are matched from the
+    start of the string and do not cross line breaks, so only the first line
+    counts. Words of a query never contain whitespace, thus every word found in
+    that line is part of one of its tokens.
+
+    :param text: str to be tokenized
+    :param folding: bool whether tokens are normalised by ``fold`` (ignoring
+        accents) instead of only being put in lower case (see ``lower``),
+        defaults to False
+    :return set of normalised tokens
+    """
+
+    line = text.split("\n", 1)[0]
+    return set((fold(line) if folding else lower(line)).split())
+
+
+def narrows(parsed, previous):
+    """ Check whether every document matching a query also matches a previous
+    one, which is the case if the query only extends the previous query by
+    further characters, words or terms
+
+    :param parsed: list of ParseResult of the query
+    :param previous: list of ParseResult of the previous query
+    :return bool
+    """
+
+    if not previous or len(parsed) < len(previous):
+        return False
+
+    *head, last = previous
+    for term, other in zip(parsed, head):
+        if (term.doc_key, term.search) != (other.doc_key, other.search):
+            return False
+
+    term = parsed[len(head)]
+    if term.doc_key != last.doc_key:
+        return False
+    words = lower(term.search).split()
+    previous_words = lower(last.search).split()
+    if not previous_words:
+        return True
+    if len(words) < len(previous_words):
+        return False
+    *leading, final = previous_words
+    return (
+        words[: len(leading)] == leading and words[len(leading)].startswith(final)
+    )
+
+
+class SearchIndex:
+    def __init__(self, fields, match_format=None, folding=False):
+        """ Constructor method
+
+        Inverted index mapping the tokens of document fields to the ids of the
+        documents containing them. Besides the given fields the string papis
+        matches queries without field against (``match-format``) is indexed
+        under the key None.
+
+        The index follows the changes of a ``DocumentStore`` (see ``refresh``)
+        and can be stored along with it.
+
+        :param fields: list of field names to be indexed
+        :param match_format: str format of the string queries without field
+            are matched against, defaults to None which uses papis' match-format
+        :param folding: bool whether tokens are normalised by ``fold``,
+            defaults to False
+        """
+
+        self.fields = tuple(fields)
+        self.match_format = match_format or papis.config.getstring("match-format")
+        self.folding = folding
+        self.postings = {field: {} for field in (None, *self.fields)}
+        self.size = 0  # number of store ids that were indexed
+        self.logpos = 0  # number of entries of the store log that were applied
+        # documents that changed after they were indexed and may still be
+        # listed under tokens they no longer contain
+        self.dirty = set()
+
+    def compatible(self, fields, match_format=None, folding=False):
+        """ Check whether index was built for the given fields, format and
+        normalisation
+
+        :param fields: list of field names
+        :param match_format: str format, defaults to None (papis' match-format)
+        :param folding: bool whether tokens are normalised by ``fold``, defaults
+            to False
+        :return bool
+        """
+
+        match_format = match_format or papis.config.getstring("match-format")
+        return (
+            self.fields == tuple(fields)
+            and self.match_format == match_format
+            and self.folding == folding
+        )
+
+    def refresh(self, store):
+        """ Index documents added to or changed in the store since the last call
+
+        :param store: DocumentStore the index belongs to
+        """
+
+        size = len(store.folders)
+        for docid in range(self.size, size):
+            if store.folders[docid] is not None:
+                self.add(store, docid)
+
+        for docid in set(store.log[self.logpos :]):
+            if docid < self.size and store.folders[docid] is not None:
+                self.add(store, docid)
+                self.dirty.add(docid)
+
+        self.size = size
+        self.logpos = len(store.log)
+
+    def add(self, store, docid):
+        """ Add tokens of a document to the index
+
+        :param store: DocumentStore holding the document
+        :param docid: int id of the document
+        """
+
+        doc = store.document(docid)
+        texts = {None: papis.format.format(self.match_format, doc)}
+        texts.update((field, str(doc[field])) for field in self.fields)
+        for field, text in texts.items():
+            postings = self.postings[field]
+            for token in tokens(text, self.folding):
+                if token not in postings:
+                    postings[sys.intern(token)] = ids()
+                postings[token].append(docid)
+
+    def lookup(self, field, word):
+        """ Return ids of documents with a token containing word
+
+        :param field: str field name or None for the match-format string
+        :param word: str normalised word (see ``tokens``)
+        :return set of document ids
+        """
+
+        result = set()
+        for token, docids in self.postings[field].items():
+            if word in token:
+                result.update(docids)
+        return result
+
+    def search(self, parsed):
+        """ Find candidates for a query parsed by papis' DocMatcher
+
+        :param parsed: list of ParseResult as returned by ``DocMatcher.parse``
+        :return tuple (set of candidate ids or None if the index can not narrow
+            down the query, bool whether all candidates are known to match)
+        """
+
+        candidates = None
+        exact = True
+        for term in parsed:
+            if term.doc_key is not None and term.doc_key not in self.fields:
+                exact = False
+                continue
+            search = fold(term.search) if self.folding else lower(term.search)
+            words = search.split()
+            # the order of several words is only checked by papis' matcher
+            if len(words) != 1:
+                exact = False
+            for word in words:
+                found = self.lookup(term.doc_key, word)
+                candidates = found if candidates is None else candidates & found
+
+        return candidates, exact
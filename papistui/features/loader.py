@@ -0,0 +1,72 @@
+import threading
+
+import papis.document
+import papis.utils
+from papistui.helpers.library import library_paths
+
+
+class DocumentLoader(threading.Thread):
+    def __init__(self, library, events, chunksize=500, first=None):
+        """ Constructor method
+
+        Reads all documents of a library in a background thread and puts them
+        into the events queue in chunks as ``("documents", docs)`` followed by
+        ``("loaded", loader)`` once done, also if loading failed (see
+        ``error``). Progress can be followed through the ``loaded`` and
+        ``total`` attributes.
+
+        :param library: str name of the library
+        :param events: queue.Queue where chunks of documents are put
+        :param chunksize: int number of documents per chunk, defaults to 500
+        :param first: int size of the first chunk, defaults to None (chunksize)
+        """
+
+        super().__init__(daemon=True)
+        self.library = library
+        self.events = events
+        self.chunksize = chunksize
+        self.first = first or chunksize
+        self.stopped = threading.Event()
+        self.loaded = 0
+        self.total = None
+        self.error = None  # str message if loading failed
+
+    def stop(self):
+        """ Stop loading after the current document """
+        self.stopped.set()
+
+    def run(self):
+        try:
+            self.load()
+        except Exception as e:
+            # e.g. a library that cannot be read, the documents loaded so far
+            # are kept
+            self.error = str(e) or type(e).__name__
+        finally:
+            self.events.put(("loaded", self))
+
+    def load(self):
+        """ Read documents and put them into the events queue in chunks """
+
+        folders = []
+        for path in library_paths(self.library):
+            folders += papis.utils.get_folders(path)
+
+        # same order as Tui.getalldocs, which lists the library in reverse
+        folders.reverse()
+        self.total = len(folders)
+        size = self.first
+        chunk = []
+        for folder in folders:
+            if self.stopped.is_set():
+                return
+            chunk.append(papis.document.from_folder(folder))
+            if len(chunk) >= size:
+                self.loaded += len(chunk)
+                self.events.put(("documents", chunk))
+                chunk = []
+                size = self.chunksize
+
+        if chunk:
+            self.loaded += len(chunk)
+            self.events.put(("documents", chunk))
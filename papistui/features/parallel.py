@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+import threading
+from itertools import chain
+
+from papis.docmatcher import DocMatcher
+from papistui.features.predicate import compile_query
+from papistui.features.store import ids
+
+# strings to match (MatchTexts) inherited by the forked workers, so that
+# documents do not have to be sent to them
+_texts = None
+# pool of worker processes and what it was forked with (see ``ready``)
+_pool = None
+
+
+def workers(configured=None):
+    """ Return number of processes to match documents with
+
+    :param configured: int number of processes, defaults to None which uses
+        the number of available cores
+    :return int, 1 if documents can not be matched in parallel
+    """
+
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return 1
+    return configured or os.cpu_count() or 1
+
+
+def match_chunk(task):
+    """ Return ids of documents in chunk matching a query (run by the worker
+    processes)
+
+    :param task: tuple (str query, array of document ids)
+    :return array of ids of matching documents
+    """
+
+    query, chunk = task
+    return ids(filter(compile_query(DocMatcher.parse(query), _texts), chunk))
+
+
+def ready(texts, processes, generation):
+    """ Check whether documents can be matched in parallel right now
+
+    Worker processes are forked once and kept as long as the documents do not
+    change, so that they keep the strings they matched against. A pool forked
+    for other documents is closed. Forking a new one is only safe while no
+    other threads (loading, watching the library, indexing) are running, as a
+    child could otherwise inherit a lock held by one of them.
+
+    :param texts: MatchTexts of the store holding the documents
+    :param processes: int number of worker processes
+    :param generation: int store generation
+    :return bool
+    """
+
+    if _pool is not None and _pool[1:] == (texts, processes, generation):
+        return True
+    close_pool()
+    return threading.active_count() == 1
+
+
+def close_pool():
+    """ Stop the worker processes, if any """
+
+    global _pool, _texts
+
+    if _pool is not None:
+        _pool[0].terminate()
+        _pool[0].join()
+    _pool = None
+    _texts = None
+
+
+def parallel_matches(texts, docids, query, processes, generation):
+    """ Match documents against a query using several processes
+
+    Documents are split into consecutive chunks, which are matched by forked
+    worker processes, and the matching ids are put together in their original
+    order. Callers check ``ready`` first.
+
+    :param texts: MatchTexts of the store holding the documents
+    :param docids: list or array of document ids
+    :param query: str query to be interpreted by papis docmatch
+    :param processes: int number of worker processes
+    :param generation: int store generation
+    :return array of ids of matching documents
+    """
+
+    global _pool, _texts
+
+    if _pool is None:
+        _texts = texts
+        context = multiprocessing.get_context("fork")
+        _pool = (context.Pool(processes), texts, processes, generation)
+
+    # several chunks per process, so that processes finishing early help out
+    size = max(1, -(-len(docids) // (4 * processes)))
+    tasks = [(query, docids[i : i + size]) for i in range(0, len(docids), size)]
+    return ids(chain.from_iterable(_pool[0].map(match_chunk, tasks)))
@@ -0,0 +1,173 @@
+import unicodedata
+from functools import lru_cache
+
+import papis.config
+import papis.format
+
+# characters re.IGNORECASE treats as equal although they differ in lower case
+# (their upper case has several characters)
+SAME_CASE = {"\u1fd3": "\u0390", "\u1fe3": "\u03b0", "\ufb05": "\ufb06"}
+
+
+@lru_cache(maxsize=None)
+def lower_char(char):
+    """ Return the character re.IGNORECASE considers a character equal to,
+    the same for all characters it considers equal (e.g. "s" for "S" and the
+    long s, "i" for "İ", sigma for final sigma)
+
+    :param char: str of length 1
+    :return str of length 1
+    """
+
+    low = SAME_CASE.get(char) or char.lower()[0]
+    up = low.upper()
+    return up.lower()[0] if len(up) == 1 else low
+
+
+def lower(text):
+    """ Return text in lower case the way re.IGNORECASE compares it, so that a
+    word is found in the result exactly if papis' pattern would find it in
+    the text ignoring case
+
+    :param text: str
+    :return str of the same length as text
+    """
+
+    if text.isascii():
+        return text.lower()
+    return "".join(map(lower_char, text))
+
+
+def fold(text):
+    """ Return text in lower case and without accents, e.g. "schlogl" for
+    "Schlögl"
+
+    :param text: str
+    :return str
+    """
+
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+class MatchTexts:
+    def __init__(self, store, match_format=None, folding=False):
+        """ Constructor method
+
+        Cache of the strings papis docmatch matches queries against, i.e. the
+        value of a field or the match-format string (field None), together
+        with their normalised form. Only the first line counts, since the
+        patterns of papis do not cross line breaks. Entries are renewed once a
+        document changes (see ``DocumentStore.versions``), e.g. when it is
+        tagged or edited.
+
+        :param store: DocumentStore holding the documents
+        :param match_format: str format of the string queries without field
+            are matched against, defaults to None which uses papis' match-format
+        :param folding: bool whether strings are normalised by ``fold``
+            (ignoring accents) instead of only being put in lower case,
+            defaults to False
+        """
+
+        self.store = store
+        self.match_format = match_format or papis.config.getstring("match-format")
+        self.folding = folding
+        self.texts = {}  # field -> {id: (version, (line, normalised line))}
+
+    def get(self, docid, field):
+        """ Return the string a query term is matched against
+
+        :param docid: int document id
+        :param field: str field name or None for the match-format string
+        :return tuple (first line, first line folded or in lower case, None if
+            it is not ASCII and can thus only be matched by papis' pattern)
+        """
+
+        cache = self.texts.get(field)
+        if cache is None:
+            cache = self.texts[field] = {}
+        version = self.store.versions[docid]
+        entry = cache.get(docid)
+        if entry is None or entry[0] != version:
+            doc = self.store.document(docid)
+            if field is None:
+                text = papis.format.format(self.match_format, doc)
+            else:
+                text = str(doc[field])
+            line = text.split("\n", 1)[0]
+            if self.folding:
+                lower = fold(line)
+            else:
+                lower = line.lower() if line.isascii() else None
+            entry = cache[docid] = (version, (line, lower))
+        return entry[1]
+
+
+def term_matcher(term, folding=False):
+    """ Compile a term of a query into a function telling whether a string
+    matches it the way papis docmatch would
+
+    papis matches the pattern ``.*word1.*word2.*`` (ignoring case) from the
+    start of the string, which is the same as finding the words one after the
+    other in its first line. Unless either is not ASCII (where case folding
+    rules of ``re`` apply), words are thus looked up with ``str.find``. With
+    folding, words and strings are compared without accents.
+
+    :param term: ParseResult as returned by ``DocMatcher.parse``
+    :param folding: bool whether strings were normalised by ``fold``, defaults
+        to False
+    :return function taking (line, normalised line or None) and returning bool
+    """
+
+    pattern = term.pattern
+    words = term.search.split()
+    if folding:
+        words = [fold(word) for word in words]
+    elif all(word.isascii() for word in words):
+        words = [word.lower() for word in words]
+    else:
+        return lambda line, lower: pattern.match(line) is not None
+
+    def match(line, lower):
+        if lower is None:
+            return pattern.match(line) is not None
+        pos = 0
+        for word in words:
+            pos = lower.find(word, pos)
+            if pos < 0:
+                return False
+            pos += len(word)
+        return True
+
+    return match
+
+
+def compile_query(parsed, texts):
+    """ Compile a query into a predicate on document ids
+
+    Terms are checked from the most to the least selective one (estimated by
+    the length of their words), stopping at the first one that does not match.
+
+    :param parsed: list of ParseResult as returned by ``DocMatcher.parse``
+    :param texts: MatchTexts of the store holding the documents
+    :return function taking a document id and returning bool whether the
+        document matches all terms of the query
+    """
+
+    # papis docmatch does not match anything with an empty query
+    if not parsed:
+        return lambda docid: False
+
+    terms = sorted(parsed, key=lambda term: -len("".join(term.search.split())))
+    checks = [(term.doc_key, term_matcher(term, texts.folding)) for term in terms]
+    get = texts.get
+
+    def predicate(docid):
+        for field, match in checks:
+            if not match(*get(docid, field)):
+                return False
+        return True
+
+    return predicate
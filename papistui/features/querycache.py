@@ -0,0 +1,73 @@
+from collections import OrderedDict
+
+from papistui.features.predicate import lower
+
+
+def normalise(parsed):
+    """ Return a key identifying a query irrespective of case and whitespace,
+    which papis docmatch ignores as well
+
+    :param parsed: list of ParseResult as returned by ``DocMatcher.parse``
+    :return tuple of (field or None, tuple of lower case words) per term
+    """
+
+    return tuple(
+        (term.doc_key, tuple(lower(term.search).split())) for term in parsed
+    )
+
+
+class QueryCache:
+    def __init__(self, maxsize=50):
+        """ Constructor method
+
+        Least recently used cache of search results. Results are kept as arrays
+        of document ids and looked up by the normalised query and the
+        generation of the store they were computed for (see
+        ``DocumentStore.generation``), so results of a library that changed in
+        the meantime are never returned.
+
+        :param maxsize: int maximum number of results kept, defaults to 50
+        """
+
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.results)
+
+    def get(self, key, generation):
+        """ Return cached results and mark them as recently used
+
+        :param key: normalised query as returned by ``normalise``
+        :param generation: int generation of the store
+        :return array of document ids or None if not cached
+        """
+
+        results = self.results.get((key, generation))
+        if results is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.results.move_to_end((key, generation))
+        return results
+
+    def put(self, key, generation, results):
+        """ Add results to cache, evicting the least recently used ones if full
+
+        :param key: normalised query as returned by ``normalise``
+        :param generation: int generation of the store
+        :param results: array of document ids
+        """
+
+        self.results[key, generation] = results
+        self.results.move_to_end((key, generation))
+        while len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+
+    def clear(self):
+        """ Drop all results, e.g. because the order of documents changed """
+
+        self.results.clear()
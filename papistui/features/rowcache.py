@@ -0,0 +1,83 @@
+import curses
+from collections import OrderedDict
+
+
+class Recorder:
+    def __init__(self):
+        """ Constructor method
+
+        Stands in for a curses window or pad and records what is printed on it
+        so that it can be replayed later on (see ``replay``).
+        """
+
+        self.ops = []
+
+    def addstr(self, posy, posx, string, style=0):
+        self.ops.append((posy, posx, string, style))
+
+
+def replay(screen, ops, posy, errstyle=0):
+    """ Print recorded operations on screen
+
+    :param screen: curses win or pad where on which to print
+    :param ops: list of operations as recorded by ``Recorder``
+    :param posy: int vertical offset added to all operations
+    :param errstyle: int style used to print "<printerr>" if printing fails,
+        defaults to 0
+    """
+
+    for y, x, string, style in ops:
+        try:
+            screen.addstr(posy + y, x, string, style)
+        except curses.error:
+            screen.addstr(posy + y, x, "<printerr>", errstyle)
+
+
+class RowCache:
+    def __init__(self, maxsize=1000):
+        """ Constructor method
+
+        Least recently used cache of rendered rows.
+
+        :param maxsize: int maximum number of rows kept, defaults to 1000
+        """
+
+        self.maxsize = maxsize
+        self.rows = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, key):
+        """ Return cached row and mark it as recently used
+
+        :param key: hashable key of the row
+        :return list of operations or None if not cached
+        """
+
+        ops = self.rows.get(key)
+        if ops is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.rows.move_to_end(key)
+        return ops
+
+    def put(self, key, ops):
+        """ Add row to cache, evicting the least recently used one if full
+
+        :param key: hashable key of the row
+        :param ops: list of operations as recorded by ``Recorder``
+        """
+
+        self.rows[key] = ops
+        self.rows.move_to_end(key)
+        while len(self.rows) > self.maxsize:
+            self.rows.popitem(last=False)
+
+    def clear(self):
+        """ Remove all rows """
+        self.rows.clear()
@@ -0,0 +1,84 @@
+from papistui.features.store import ids
+
+
+class SavedSearch:
+    def __init__(self, name, query):
+        """ Constructor method
+
+        Search defined in the configuration whose results are kept, so that
+        switching to it does not require searching again. Once materialised,
+        the results follow the changes of the ``DocumentStore`` (see
+        ``refresh``): only documents added, updated or removed since are
+        matched again.
+
+        :param name: str name of the search
+        :param query: str query to be interpreted by papis docmatch
+        """
+
+        self.name = name
+        self.query = query
+        self.ids = None  # array of matching ids in the order of the items
+        self.members = set()  # matching ids
+        self.ordered = False  # whether ids follow the current order of items
+        self.size = 0  # number of store ids that were taken into account
+        self.logpos = 0  # number of entries of the store log that were applied
+
+    def materialise(self, store, items, matches):
+        """ Search all documents
+
+        :param store: DocumentStore holding the documents
+        :param items: array of ids of all documents in display order
+        :param matches: function (docids, query) returning array of ids of
+            matching documents
+        """
+
+        self.ids = matches(items, self.query)
+        self.members = set(self.ids)
+        self.ordered = True
+        self.size = len(store.folders)
+        self.logpos = len(store.log)
+
+    def refresh(self, store, matches, place):
+        """ Match documents added, updated or removed since the last call
+
+        :param store: DocumentStore holding the documents
+        :param matches: function (docids, query) returning array of ids of
+            matching documents
+        :param place: function (array, docid) inserting an id at its position
+            in display order, None if items are not sorted, in which case
+            results gaining documents are put in order by ``reorder``
+        """
+
+        changed = {*range(self.size, len(store.folders)), *store.log[self.logpos :]}
+        self.size = len(store.folders)
+        self.logpos = len(store.log)
+        if not changed:
+            return
+
+        alive = sorted(docid for docid in changed if store.folders[docid] is not None)
+        matching = set(matches(alive, self.query))
+        # results may be shown right now, so they are changed on a copy
+        results = ids(self.ids) if self.ordered else None
+        # changed documents leave the results before matching ones are placed,
+        # so that placing does not compare with documents that were removed
+        for docid in changed & self.members:
+            self.members.discard(docid)
+            if results is not None:
+                results.remove(docid)
+        for docid in sorted(matching):
+            self.members.add(docid)
+            if place is None:
+                self.ordered = False
+            elif results is not None:
+                place(results, docid)
+        if results is not None and self.ordered:
+            self.ids = results
+
+    def reorder(self, items):
+        """ Put results in the order of items, e.g. after sorting
+
+        :param items: array of ids of all documents in display order
+        """
+
+        self.ids = ids(docid for docid in items if docid in self.members)
+        self.ordered = True
@@ -0,0 +1,59 @@
+import threading
+import time
+
+from papistui.features.store import ids
+
+SPINNER = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+
+
+def spinner():
+    """ Return the current frame of the spinner shown while searching
+
+    :return str
+    """
+
+    return SPINNER[int(time.monotonic() * 10) % len(SPINNER)]
+
+
+class SearchWorker(threading.Thread):
+    def __init__(self, docids, predicate, events, chunksize=1000):
+        """ Constructor method
+
+        Matches documents in a background thread so that the interface keeps
+        responding to input while searching. Documents are matched in chunks,
+        between which the search can be cancelled (see ``cancel``). Puts
+        ``("search", worker)`` into the events queue once done, unless it was
+        cancelled. Progress can be followed through the ``done`` attribute and
+        the ``results`` found so far.
+
+        :param docids: list or array of ids of the documents to be matched
+        :param predicate: function taking a document id and returning bool
+            whether the document matches (see ``compile_query``)
+        :param events: queue.Queue where the event is put
+        :param chunksize: int number of documents matched between checks for
+            cancellation, defaults to 1000
+        """
+
+        super().__init__(daemon=True)
+        self.docids = docids
+        self.predicate = predicate
+        self.events = events
+        self.chunksize = chunksize
+        self.cancelled = threading.Event()
+        self.results = ids()
+        self.done = 0
+
+    def cancel(self):
+        """ Stop matching after the current chunk and drop the results """
+        self.cancelled.set()
+
+    def run(self):
+        for start in range(0, len(self.docids), self.chunksize):
+            if self.cancelled.is_set():
+                return
+            chunk = self.docids[start : start + self.chunksize]
+            self.results.extend(filter(self.predicate, chunk))
+            self.done += len(chunk)
+
+        if not self.cancelled.is_set():
+            self.events.put(("search", self))
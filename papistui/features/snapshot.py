@@ -0,0 +1,115 @@
+import os
+import pickle
+import re
+
+import papis.config
+from papistui.helpers.document import template_fields
+from papistui.helpers.library import LibraryState
+
+# bump whenever the layout of the snapshot changes
+SNAPSHOT_VERSION = 8
+
+
+def snapshot_file_name(config):
+    """ Return path of the snapshot file for the configured library
+
+    :param config: dict configuration options
+    :return str path
+    """
+
+    if config["base"].get("snapshot_file"):
+        return os.path.expanduser(config["base"]["snapshot_file"])
+
+    library = re.sub(r"[^\w.-]", "_", str(config["base"]["library"]))
+    return os.path.join(
+        papis.config.get_config_folder(), f"papistui-{library}.snapshot"
+    )
+
+
+class Snapshot:
+    def __init__(self, config):
+        """ Constructor method
+
+        A snapshot stores all documents of a library (see ``DocumentStore``)
+        in sorted order together with the state of the library (see
+        ``LibraryState``) at the time the documents were read.
+
+        :param config: dict configuration options
+        """
+
+        self.library = config["base"]["library"]
+        self.sortkeys = config["documentlist"]["defaultsort"]
+        # accents are ignored when sorting as well
+        self.folding = config["commandline"]["search"]["ignore_accents"]
+        self.path = snapshot_file_name(config)
+        # fields kept by lazy documents, None if documents are complete
+        self.fields = (
+            template_fields(config) if config["base"]["lazy_documents"] else None
+        )
+        self.state = None  # LibraryState of a loaded snapshot
+        self.stats = {}
+        self.sorted = False  # whether loaded documents follow self.sortkeys
+
+    def load(self):
+        """ Load documents from snapshot if it is still valid
+
+        :return tuple of DocumentStore and array of ids in sorted order or None
+            if snapshot is missing or outdated
+        """
+
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+        except Exception:
+            return None
+
+        if (
+            data.get("version") != SNAPSHOT_VERSION
+            or data.get("library") != self.library
+            or data.get("fields") != self.fields
+        ):
+            return None
+
+        state = LibraryState(self.library, data["stamps"], data["folders"])
+        if state.changed():
+            return None
+
+        self.state = state
+        self.stats = data["stats"]
+        self.sorted = (
+            data["sortkeys"] == self.sortkeys and data["folding"] == self.folding
+        )
+        return data["store"], data["items"]
+
+    def save(self, store, items, sortkeys, state, stats=None):
+        """ Write documents to snapshot
+
+        :param store: DocumentStore holding the documents
+        :param items: array of ids of all documents
+        :param sortkeys: list of keys the documents are currently sorted by
+        :param state: LibraryState matching the documents
+        :param stats: dict of startup statistics to be stored, defaults to None
+            which keeps the ones previously loaded
+        """
+
+        if stats is not None:
+            self.stats = stats
+
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "library": self.library,
+            "sortkeys": sortkeys,
+            "folding": self.folding,
+            "fields": self.fields,
+            "folders": state.folders,
+            "stamps": state.stamps,
+            "stats": self.stats,
+            "store": store,
+            "items": items,
+        }
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
@@ -1,3 +1,6 @@
+from datetime import datetime
+
+import papis.strings
 from papis.document import sort
 
 
@@ -62,3 +65,95 @@ def sort_multiple_keys(docs, sortkeys):
         docs = nextsort
         idx += 1
     return docs
+
+
+def sort_key(value, key, reverse=False):
+    """ Return the key papis uses to sort documents by a single key
+
+    :param value: value of key in document (None if missing)
+    :param key: str document key
+    :param reverse: bool whether sorting is decreasing, defaults to False
+    :return tuple (priority, date, int value, str value)
+    """
+
+    # priorities as in papis.document.sort: date, int, other, missing
+    priority, date, int_value, str_value = (3, datetime.fromtimestamp(0), 0, "")
+    if value is not None:
+        str_value = str(value)
+        if key == "time-added":
+            try:
+                date = datetime.strptime(str_value, papis.strings.time_format)
+                priority = 0
+            except ValueError:
+                pass
+        else:
+            try:
+                int_value = int(str_value)
+                priority = 1
+            except ValueError:
+                priority = 2
+
+    return (-priority if reverse else priority, date, int_value, str_value)
+
+
+def sort_ids(docids, sortkeys, get):
+    """ Sort document ids the way ``sort_multiple_keys`` sorts documents
+
+    :param docids: iterable of document ids
+    :param sortkeys: list or string containing sortkeys
+    :param get: callable returning the value of a key for a document id
+        e.g. ``DocumentStore.get``
+    :return list of sorted ids
+    """
+
+    docids = list(docids)
+    # stable sorts from the least to the most significant key
+    for key, reverse in reversed(process_sortkeys(sortkeys)):
+        docids.sort(
+            key=lambda docid: sort_key(get(docid, key), key, reverse),
+            reverse=reverse,
+        )
+    return docids
+
+
+def compare(docid, other, keys, get):
+    """ Compare two documents the way ``sort_multiple_keys`` orders them
+
+    :param docid: int document id
+    :param other: int document id
+    :param keys: list of tuples as returned by ``process_sortkeys``
+    :param get: callable returning the value of a key for a document id
+    :return int negative if docid comes first, positive if other comes first,
+        0 if equal
+    """
+
+    for key, reverse in keys:
+        a = sort_key(get(docid, key), key, reverse)
+        b = sort_key(get(other, key), key, reverse)
+        if a != b:
+            return (1 if a < b else -1) if reverse else (-1 if a < b else 1)
+
+    return 0
+
+
+def insert_sorted(docids, docid, sortkeys, get):
+    """ Insert document id into already sorted ids after all equal documents
+
+    :param docids: list or array of ids sorted by sortkeys
+    :param docid: int id of the document to be inserted
+    :param sortkeys: list or string containing sortkeys
+    :param get: callable returning the value of a key for a document id
+    :return int position where document was inserted
+    """
+
+    keys = process_sortkeys(sortkeys)
+    lo, hi = 0, len(docids)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if compare(docid, docids[mid], keys, get) < 0:
+            hi = mid
+        else:
+            lo = mid + 1
+
+    docids.insert(lo, docid)
+    return lo
@@ -0,0 +1,231 @@
+import sys
+import weakref
+from array import array
+
+import papis.document
+from papistui.helpers.document import LazyDocument
+
+
+def ids(values=()):
+    """ Return array suitable to hold document ids
+
+    :param values: iterable of ids, defaults to ()
+    :return array of ints
+    """
+
+    return array("l", values)
+
+
+def compact(value):
+    """ Return value in a form that can be shared between documents
+
+    :param value: field value
+    :return interned str, tuple of interned str or value itself
+    """
+
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list) and all(isinstance(v, str) for v in value):
+        return tuple(sys.intern(v) for v in value)
+    return value
+
+
+def deepsize(obj, seen=None):
+    """ Return approximate number of bytes used by obj and everything it holds
+
+    :param obj: any object
+    :param seen: set of ids of objects already counted, defaults to None
+    :return int number of bytes
+    """
+
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deepsize(k, seen) + deepsize(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deepsize(v, seen) for v in obj)
+    if hasattr(obj, "__dict__"):
+        size += deepsize(obj.__dict__, seen)
+    return size
+
+
+class DocumentStore:
+    def __init__(self, fields=None):
+        """ Constructor method
+
+        Holds all documents under integer ids, so that lists of documents
+        (items, views, sort orders) can be kept as arrays of ids.
+
+        If fields are given, only these fields are stored, column-wise with
+        strings shared between documents. Document objects (``LazyDocument``)
+        are then only created when needed, e.g. for the rows on screen or to
+        run commands, and shared as long as they are in use. Otherwise the
+        complete document objects are kept.
+
+        :param fields: set of field names to store, defaults to None which keeps
+            the document objects
+        """
+
+        self.fields = fields
+        self.folders = []  # id -> main folder, None once removed
+        self.versions = ids()  # id -> number of times the document changed
+        self.docs = [] if fields is None else None
+        self.columns = {field: [] for field in fields} if fields else None
+        self.cache = weakref.WeakValueDictionary()  # documents currently in use
+        self.removed = 0
+        self.log = ids()  # ids of documents updated or removed, in order
+        self.index = None  # SearchIndex kept along with the documents
+        self.trigrams = None  # TrigramIndex, only built once needed
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["cache"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.cache = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        return len(self.folders) - self.removed
+
+    @property
+    def generation(self):
+        """ Number of changes made to the store, which grows with every
+        document added, updated or removed """
+
+        return len(self.folders) + len(self.log)
+
+    def add(self, docs):
+        """ Add documents to the store
+
+        :param docs: list of documents
+        :return array of ids of the new documents
+        """
+
+        start = len(self.folders)
+        for docid, doc in enumerate(docs, start):
+            self.folders.append(doc.get_main_folder())
+            self.versions.append(0)
+            if self.columns is None:
+                doc.docid = docid
+                self.docs.append(doc)
+            else:
+                for field, column in self.columns.items():
+                    column.append(compact(doc.get(field)))
+
+        return ids(range(start, len(self.folders)))
+
+    def update(self, docs):
+        """ Take over the current content of documents already in the store
+
+        :param docs: list of documents
+        """
+
+        for doc in docs:
+            self.versions[doc.docid] += 1
+            self.log.append(doc.docid)
+            if self.columns is not None:
+                for field, column in self.columns.items():
+                    column[doc.docid] = compact(doc.get(field))
+
+    def remove(self, docs):
+        """ Remove documents from store
+
+        :param docs: list of documents
+        """
+
+        for doc in docs:
+            self.folders[doc.docid] = None
+            self.versions[doc.docid] += 1
+            self.log.append(doc.docid)
+            if self.columns is None:
+                self.docs[doc.docid] = None
+            else:
+                for column in self.columns.values():
+                    column[doc.docid] = None
+            self.removed += 1
+
+    def get(self, docid, key, default=None):
+        """ Return value of a field without creating a document if possible
+
+        :param docid: int document id
+        :param key: str field name
+        :param default: value returned if field is missing, defaults to None
+        """
+
+        if self.columns is None:
+            return self.docs[docid].get(key, default)
+        if key in self.columns:
+            value = self.columns[key][docid]
+            return default if value is None else value
+        return self.document(docid).get(key, default)
+
+    def document(self, docid):
+        """ Return document with given id
+
+        :param docid: int document id
+        :return document
+        """
+
+        if self.columns is None:
+            return self.docs[docid]
+
+        doc = self.cache.get(docid)
+        if doc is None:
+            data = {}
+            for field, column in self.columns.items():
+                value = column[docid]
+                if value is not None:
+                    data[field] = list(value) if isinstance(value, tuple) else value
+            doc = LazyDocument(self.folders[docid], data, self.fields)
+            doc.docid = docid
+            self.cache[docid] = doc
+        return doc
+
+    def documents(self, docids):
+        """ Return documents with given ids
+
+        :param docids: iterable of document ids
+        :return list of documents
+        """
+
+        return [self.document(docid) for docid in docids]
+
+    def find(self):
+        """ Return mapping of document folders to ids
+
+        :return dict
+        """
+
+        return {
+            folder: docid
+            for docid, folder in enumerate(self.folders)
+            if folder is not None
+        }
+
+    def memory(self, sample=200):
+        """ Estimate memory used per document by the store and by the same
+        documents kept as complete document objects
+
+        :param sample: int number of documents to measure, defaults to 200
+        :return tuple of bytes per document (store, document objects)
+        """
+
+        count = len(self)
+        if count == 0:
+            return 0, 0
+
+        sample_ids = [docid for docid, folder in enumerate(self.folders) if folder]
+        sample_ids = sample_ids[:: max(1, count // sample)][:sample]
+        if self.columns is None:
+            size = int(deepsize(self.documents(sample_ids)) / len(sample_ids))
+            return size, size
+
+        store = (deepsize(self.folders) + deepsize(self.columns)) / count
+        objects = [papis.document.from_folder(self.folders[i]) for i in sample_ids]
+        return int(store), int(deepsize(objects) / len(objects))
@@ -0,0 +1,260 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+
+import papis.config
+from papistui.helpers.library import library_paths, scan_folder
+
+# see inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    def __init__(self, paths):
+        """ Constructor method
+
+        Watches all folders below paths using the inotify API of the linux
+        kernel. Raises OSError if inotify is not available or the folders can
+        not be watched (e.g. because fs.inotify.max_user_watches is exceeded).
+
+        :param paths: list of folders to watch
+        """
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self.libc = libc
+        self.roots = paths
+        self.info_name = papis.config.getstring("info-name")
+        self.watches = {}  # watch descriptor -> folder
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        try:
+            for path in paths:
+                self.add_tree(path)
+        except OSError:
+            self.close()
+            raise
+
+    def add_watch(self, folder):
+        """ Watch a single folder
+
+        :param folder: str path
+        """
+
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), folder)
+        self.watches[wd] = folder
+
+    def add_tree(self, path):
+        """ Watch a folder and all of its subfolders
+
+        :param path: str path
+        """
+
+        for root, _, _ in os.walk(path):
+            self.add_watch(root)
+
+    def poll(self, timeout):
+        """ Wait for events and return the folders they concern
+
+        :param timeout: float seconds to wait at most
+        :return set of changed folders
+        """
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = os.fsdecode(data[pos : pos + length].rstrip(b"\0"))
+            pos += length
+
+            if mask & IN_Q_OVERFLOW:
+                # events were lost, everything has to be checked
+                changed.update(self.roots)
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+
+            folder = self.watches.get(wd)
+            if folder is None:
+                continue
+            if mask & IN_ISDIR:
+                path = os.path.join(folder, name)
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        self.add_tree(path)
+                    except OSError:
+                        pass
+                changed.add(path)
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                changed.add(folder)
+            elif name == self.info_name:
+                changed.add(folder)
+
+        return changed
+
+    def close(self):
+        """ Stop watching """
+        os.close(self.fd)
+
+
+class Poller:
+    def __init__(self, paths, interval=2):
+        """ Constructor method
+
+        Fallback for systems without inotify: compares modification times of
+        all info files below paths every interval seconds.
+
+        :param paths: list of folders to watch
+        :param interval: float seconds between two scans, defaults to 2
+        """
+
+        self.paths = paths
+        self.interval = interval
+        self.stamps = self.scan()
+        self.next = time.monotonic() + interval
+
+    def scan(self):
+        """ Return modification times of all info files below paths """
+
+        stamps = {}
+        for path in self.paths:
+            stamps.update(scan_folder(path))
+        return stamps
+
+    def poll(self, timeout):
+        """ Wait until the next scan is due and return changed folders
+
+        :param timeout: float seconds to wait at most
+        :return set of changed folders
+        """
+
+        wait = min(timeout, self.next - time.monotonic())
+        if wait > 0:
+            time.sleep(wait)
+        if time.monotonic() < self.next:
+            return set()
+
+        stamps = self.scan()
+        changed = {
+            folder
+            for folder in stamps.keys() | self.stamps.keys()
+            if stamps.get(folder) != self.stamps.get(folder)
+        }
+        self.stamps = stamps
+        self.next = time.monotonic() + self.interval
+        return changed
+
+    def close(self):
+        pass
+
+
+class LibraryWatcher(threading.Thread):
+    def __init__(self, library, events, debounce=0.5, interval=2):
+        """ Constructor method
+
+        Watches the library for documents that are added, modified or removed
+        by other programs and puts the affected folders into the events queue
+        as ``("changes", folders)``. Uses inotify where available and falls back
+        to polling otherwise. Events are collected until nothing happened for
+        debounce seconds, so that e.g. adding many documents at once results in
+        a single update. Setting up the watches (or the first scan) walks the
+        whole library and is thus done by the thread itself.
+
+        :param library: str name of the library
+        :param events: queue.Queue where changes are put
+        :param debounce: float seconds without events before changes are
+            reported, defaults to 0.5
+        :param interval: float seconds between two scans when polling,
+            defaults to 2
+        """
+
+        super().__init__(daemon=True)
+        self.events = events
+        self.debounce = debounce
+        self.library = library
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.backend = None
+        self.mode = None  # "inotify" or "polling" once watching
+
+    def start_backend(self):
+        """ Set up inotify watches or the poller if inotify is not available """
+
+        paths = library_paths(self.library)
+        try:
+            self.backend = Inotify(paths)
+            self.mode = "inotify"
+        except OSError:
+            self.backend = Poller(paths, self.interval)
+            self.mode = "polling"
+
+    def stop(self):
+        """ Stop watching """
+        self.stopped.set()
+
+    def run(self):
+        self.start_backend()
+        pending = set()
+        first = last = None
+        try:
+            while not self.stopped.is_set():
+                timeout = self.debounce if pending else 0.5
+                changed = self.backend.poll(timeout)
+                now = time.monotonic()
+                if changed:
+                    pending |= changed
+                    last = now
+                    first = first or now
+                # report at least every few seconds while events keep coming
+                if pending and (
+                    now - last >= self.debounce or now - first >= 10 * self.debounce
+                ):
+                    self.events.put(("changes", pending))
+                    pending = set()
+                    first = last = None
+        finally:
+            self.backend.close()
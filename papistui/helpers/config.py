@@ -41,7 +41,7 @@ default_config = {
         "right": {
             "default": (
                 '<black_white> {info["idx"]} < {info["marked"]} '
-                '< {info["view"]} < {info["items"]}  <black_white>')
+                '< {info["view"]} < {info["items"]}{info["progress"]}  <black_white>')
         },
     },
     "keymappings": {
@@ -110,6 +110,14 @@ def complete_config(config):
 
     config["base"].setdefault("library", papis.config.get_lib_name())
     config["base"].setdefault("vimflavour", "vim")
+    config["base"].setdefault("snapshot", True)
+    config["base"].setdefault("progressive_loading", False)
+    config["base"].setdefault("loading_chunksize", 500)
+    config["base"].setdefault("watch", False)
+    config["base"].setdefault("lazy_documents", False)
+    config["base"].setdefault("watch_debounce", 0.5)
+    config["base"].setdefault("watch_interval", 2)
+    config["base"].setdefault("typeahead", 50)
 
     # documentlist
     if not config.get("documentlist"):
@@ -119,6 +127,7 @@ def complete_config(config):
     config["documentlist"].setdefault("defaultstyle", "multiline")
     config["documentlist"].setdefault("tagfield", "tags")
     config["documentlist"].setdefault("defaultsort", "")
+    config["documentlist"].setdefault("rowcache_size", 1000)
 
     if "defaultsort" in config["documentlist"]:
         config["documentlist"]["defaultsort"] = config["documentlist"][
@@ -145,11 +154,51 @@ def complete_config(config):
             "documentlist"
         ]["multilinestyle"]["rows"]
 
+    # commandline
+    if not config.get("commandline"):
+        config["commandline"] = {}
+    if not config["commandline"].get("search"):
+        config["commandline"]["search"] = {}
+
+    config["commandline"]["search"].setdefault(
+        "index_fields", ["author", "title", "year", "tags", "ref", "journal"]
+    )
+    config["commandline"]["search"].setdefault("keyword_aliases", {})
+    config["commandline"]["search"].setdefault("saved", {})
+    config["commandline"]["search"].setdefault("ignore_accents", False)
+    config["commandline"]["search"].setdefault("live", False)
+    config["commandline"]["search"].setdefault(
+        "fuzzy_fields", ["title", "author", "ref", "journal"]
+    )
+    config["commandline"]["search"].setdefault("fuzzy_budget", 0.05)
+    config["commandline"]["search"].setdefault("live_debounce", 0.1)
+    config["commandline"]["search"].setdefault("cache_size", 50)
+    config["commandline"]["search"].setdefault("parallel_threshold", 0)
+    config["commandline"]["search"].setdefault("parallel_workers", None)
+    config["commandline"]["search"].setdefault("background_threshold", 20000)
+
     if "infowindow" not in config:
         config["infowindow"] = {}
 
     config["infowindow"].setdefault("default_on", False)
 
+    if not config.get("facets"):
+        config["facets"] = {}
+
+    config["facets"].setdefault("fields", ["tags", "year", "author", "journal"])
+    config["facets"].setdefault("height", 6)
+    config["facets"].setdefault("limit", 20)
+
+    if not config.get("fulltext"):
+        config["fulltext"] = {}
+
+    config["fulltext"].setdefault("index", False)
+    config["fulltext"].setdefault("snippet_height", 6)
+    config["fulltext"].setdefault(
+        "extractors",
+        {"pdf": "pdftotext -q -enc UTF-8 {file} -", "djvu": "djvutxt {file}"},
+    )
+
     return config
 
 
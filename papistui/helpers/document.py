@@ -2,6 +2,9 @@
 This is used to inject additional methods into papis Document class
 """
 
+import re
+
+import papis.config
 from papis.document import Document
 from papistui.helpers.config import get_config
 
@@ -76,3 +79,138 @@ def forfile(self, string="*", sep=""):
 
 
 Document.forfile = forfile
+
+
+# document fields referenced in templates, e.g. doc["title"], doc.html_escape['ref'],
+# doc.get("year"), doc.alias("type"), doc.foreach("tags", ...) or {doc[author]}
+FIELD_PATTERNS = [
+    re.compile(r"""\bdoc(?:\.html_escape)?\[\s*["']?([\w-]+)["']?\s*\]"""),
+    re.compile(r"""\bdoc\.(?:get|has|alias|foreach)\(\s*["']([\w-]+)["']"""),
+]
+
+
+def template_fields(config):
+    """ Return all document fields needed to display, sort and search documents
+
+    :param config: dict configuration options
+    :return set of field names
+    """
+
+    def strings(obj):
+        if isinstance(obj, str):
+            yield obj
+        elif isinstance(obj, dict):
+            for value in obj.values():
+                yield from strings(value)
+        elif isinstance(obj, list):
+            for value in obj:
+                yield from strings(value)
+
+    templates = [
+        *strings(config["documentlist"]),
+        *strings(config["statusbar"]),
+        papis.config.getstring("match-format"),
+    ]
+    fields = {config["documentlist"]["tagfield"]}
+    for template in templates:
+        for pattern in FIELD_PATTERNS:
+            fields.update(pattern.findall(template))
+        if "forfile(" in template:
+            fields.add("files")
+    fields.update(key.rstrip("-") for key in config["documentlist"]["defaultsort"])
+    fields.update(config["commandline"]["search"]["index_fields"])
+    fields.update(config["commandline"]["search"]["fuzzy_fields"])
+    fields.update(config["facets"]["fields"])
+    fields.add("files")  # attachments are read by the full text indexer
+
+    return fields
+
+
+class LazyDocument(Document):
+    def __init__(self, folder, data, fields):
+        """ Constructor method
+
+        Document holding only the given fields. All other fields are read from
+        the info file the first time they are accessed or the document is saved,
+        copied or iterated over.
+
+        :param folder: str main folder of the document
+        :param data: dict with (a subset of) the document's fields
+        :param fields: set of field names kept, fields in this set but not
+            in data are known to be missing from the document
+        """
+
+        super().__init__()
+        self.set_folder(folder)
+        dict.update(self, {key: data[key] for key in fields if key in data})
+        self._fields = fields
+        self._complete = False
+
+    def complete(self):
+        """ Read all fields from the info file keeping changes made in memory """
+
+        if self._complete:
+            return
+
+        current = dict(dict.items(self))
+        self.load()
+        for key in self._fields:
+            if key not in current:
+                dict.pop(self, key, None)
+        dict.update(self, current)
+
+    def load(self):
+        self._complete = True
+        super().load()
+
+    def __missing__(self, key):
+        if self._complete or key in self._fields:
+            return ""
+        self.complete()
+        return dict.get(self, key, "")
+
+    def __contains__(self, key):
+        if not dict.__contains__(self, key) and key not in self._fields:
+            self.complete()
+        return dict.__contains__(self, key)
+
+    def get(self, key, default=None):
+        return dict.get(self, key, default) if key in self else default
+
+    def __iter__(self):
+        self.complete()
+        return dict.__iter__(self)
+
+    def keys(self):
+        self.complete()
+        return dict.keys(self)
+
+    def values(self):
+        self.complete()
+        return dict.values(self)
+
+    def items(self):
+        self.complete()
+        return dict.items(self)
+
+    def copy(self):
+        self.complete()
+        return super().copy()
+
+    def save(self):
+        self.complete()
+        super().save()
+
+    def __reduce_ex__(self, protocol):
+        # pickle only the fields that are present without loading the others
+        return (
+            _restore_lazy_document,
+            (type(self),),
+            self.__dict__,
+            None,
+            iter(dict.items(self)),
+        )
+
+
+def _restore_lazy_document(cls):
+    return cls.__new__(cls)
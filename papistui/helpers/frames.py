@@ -0,0 +1,93 @@
+"""
+Batches screen updates so that the terminal is only written to once per frame
+"""
+
+import curses
+import time
+
+
+class FrameScheduler:
+    def __init__(self):
+        """ Constructor method
+
+        Components copy their windows to the virtual screen using ``refresh``
+        instead of refreshing them one by one. The main loop then updates the
+        physical screen once with ``update``.
+        """
+
+        self.pending = False
+        self.started = None  # time input for the current frame was received
+        self.stats = {
+            "frames": 0,
+            "refreshes": {},  # number of refreshes per component
+            "update": 0.0,  # total time spent updating the physical screen
+            "latency": 0.0,  # total time from receiving input to update
+            "max_latency": 0.0,
+            "last_latency": 0.0,
+        }
+
+    def begin(self):
+        """ Mark the time input for the next frame was received """
+
+        if self.started is None:
+            self.started = time.perf_counter()
+
+    def refresh(self, component, win, *args):
+        """ Copy window or pad to the virtual screen to be shown with the next
+        update
+
+        :param component: object refreshing the window, used for statistics
+        :param win: curses window or pad
+        :param args: arguments passed on to noutrefresh (required for pads)
+        """
+
+        win.noutrefresh(*args)
+        self.pending = True
+        name = type(component).__name__
+        refreshes = self.stats["refreshes"]
+        refreshes[name] = refreshes.get(name, 0) + 1
+
+    def update(self):
+        """ Update the physical screen if anything was refreshed since the last
+        update
+
+        :return bool whether the screen was updated
+        """
+
+        if not self.pending:
+            self.started = None
+            return False
+
+        start = time.perf_counter()
+        curses.doupdate()
+        end = time.perf_counter()
+        latency = end - (self.started or start)
+        self.stats["frames"] += 1
+        self.stats["update"] += end - start
+        self.stats["latency"] += latency
+        self.stats["last_latency"] = latency
+        self.stats["max_latency"] = max(self.stats["max_latency"], latency)
+        self.pending = False
+        self.started = None
+        return True
+
+    def report(self):
+        """ Summarise frame statistics
+
+        :return str report
+        """
+
+        frames = self.stats["frames"]
+        if frames == 0:
+            return "No frames drawn yet"
+
+        refreshes = sum(self.stats["refreshes"].values())
+        return (
+            f"{frames} frames, {refreshes / frames:.1f} refreshes per frame, "
+            f"latency {1000 * self.stats['latency'] / frames:.2f}ms avg "
+            f"{1000 * self.stats['max_latency']:.2f}ms max, "
+            f"screen update {1000 * self.stats['update'] / frames:.2f}ms avg"
+        )
+
+
+frames = FrameScheduler()
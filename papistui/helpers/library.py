@@ -0,0 +1,215 @@
+"""
+Helpers to inspect the state of a papis library on disk without loading it
+"""
+
+import os
+
+import papis.config
+
+
+def library_paths(library):
+    """ Return the directories a library consists of
+
+    :param library: str name of the library (or path to a folder)
+    :return list of absolute paths
+    """
+
+    return papis.config.get_lib_from_name(library).paths
+
+
+def mtime(path):
+    """ Return modification time of path or None if it does not exist
+
+    :param path: str path to file or folder
+    :return float modification time or None
+    """
+
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def document_stamps(folders):
+    """ Return modification time of the info file of each document
+
+    :param folders: list of document folders (None entries are skipped)
+    :return dict mapping document folders to info file modification times
+    """
+
+    info_name = papis.config.getstring("info-name")
+    return {
+        folder: mtime(os.path.join(folder, info_name))
+        for folder in folders
+        if folder
+    }
+
+
+def folder_stamps(library, stamps):
+    """ Return modification times of the library folders and of all folders
+    containing documents. These change whenever documents are added or removed.
+
+    :param library: str name of the library
+    :param stamps: dict as returned by ``document_stamps``
+    :return dict mapping folders to modification times
+    """
+
+    folders = set(library_paths(library))
+    for folder in stamps:
+        parent = os.path.dirname(folder)
+        while parent not in folders and parent != os.path.dirname(parent):
+            folders.add(parent)
+            parent = os.path.dirname(parent)
+
+    return {folder: mtime(folder) for folder in folders}
+
+
+def folders_changed(stamps):
+    """ Check whether any of the recorded folders was modified
+
+    :param stamps: dict as returned by ``folder_stamps``
+    :return bool True if anything changed on disk
+    """
+
+    return any(mtime(folder) != stamp for folder, stamp in stamps.items())
+
+
+def documents_changed(stamps):
+    """ Return folders of documents whose info file was modified or removed
+
+    :param stamps: dict as returned by ``document_stamps``
+    :return list of document folders
+    """
+
+    info_name = papis.config.getstring("info-name")
+    return [
+        folder
+        for folder, stamp in stamps.items()
+        if mtime(os.path.join(folder, info_name)) != stamp
+    ]
+
+
+def scan_folder(path):
+    """ Walk a folder and return the modification time of every info file
+
+    :param path: str folder to walk
+    :return dict mapping document folders to info file modification times
+    """
+
+    info_name = papis.config.getstring("info-name")
+    stamps = {}
+    for root, _, files in os.walk(path):
+        if info_name in files:
+            stamps[root] = mtime(os.path.join(root, info_name))
+
+    return stamps
+
+
+def scan_library(library):
+    """ Walk the library and return the modification time of every info file
+
+    :param library: str name of the library
+    :return dict mapping document folders to info file modification times
+    """
+
+    stamps = {}
+    for path in library_paths(library):
+        stamps.update(scan_folder(path))
+
+    return stamps
+
+
+class LibraryState:
+    def __init__(self, library, stamps=None, folders=None):
+        """ Constructor method
+
+        Keeps track of the modification times of the info files of all loaded
+        documents as well as of the folders they live in, in order to find out
+        what changed on disk since documents were read.
+
+        :param library: str name of the library
+        :param stamps: dict mapping document folders to info file modification
+            times, defaults to None
+        :param folders: dict mapping library folders to modification times,
+            defaults to None
+        """
+
+        self.library = library
+        self.stamps = stamps or {}
+        self.folders = folders or {}
+
+    def record(self, folders):
+        """ Record modification times for documents freshly read from the library
+
+        :param folders: list of document folders
+        """
+
+        self.stamps = document_stamps(folders)
+        self.folders = folder_stamps(self.library, self.stamps)
+
+    def touch(self, docs):
+        """ Update modification times of documents saved from within papis-tui
+
+        :param docs: list of documents
+        """
+
+        self.stamps.update(document_stamps(doc.get_main_folder() for doc in docs))
+
+    def changed(self):
+        """ Check whether anything changed on disk since documents were recorded
+
+        :return bool
+        """
+
+        return folders_changed(self.folders) or len(documents_changed(self.stamps)) > 0
+
+    def scan(self):
+        """ Find documents that were added, modified or removed on disk and
+        record the current state
+
+        :return tuple of lists of folders (added, modified, removed)
+        """
+
+        stamps = scan_library(self.library)
+        added = [folder for folder in stamps if folder not in self.stamps]
+        removed = [folder for folder in self.stamps if folder not in stamps]
+        modified = [
+            folder
+            for folder, stamp in stamps.items()
+            if folder in self.stamps and self.stamps[folder] != stamp
+        ]
+        self.stamps = stamps
+        self.folders = folder_stamps(self.library, stamps)
+
+        return added, modified, removed
+
+    def check(self, paths):
+        """ Like ``scan`` but only look at documents in or below the given paths
+
+        :param paths: list of folders that changed on disk
+        :return tuple of lists of folders (added, modified, removed)
+        """
+
+        stamps = {}
+        for path in paths:
+            stamps.update(scan_folder(path))
+        prefixes = tuple(os.path.join(path, "") for path in paths)
+        known = [
+            folder
+            for folder in self.stamps
+            if folder in paths or folder.startswith(prefixes)
+        ]
+
+        added = [folder for folder in stamps if folder not in self.stamps]
+        removed = [folder for folder in known if folder not in stamps]
+        modified = [
+            folder
+            for folder, stamp in stamps.items()
+            if folder in self.stamps and self.stamps[folder] != stamp
+        ]
+        for folder in removed:
+            del self.stamps[folder]
+        self.stamps.update(stamps)
+        self.folders = folder_stamps(self.library, self.stamps)
+
+        return added, modified, removed
@@ -0,0 +1,61 @@
+"""
+Rewrites search queries before they are evaluated
+"""
+
+import re
+
+
+class QueryRewriter:
+    def __init__(self, aliases=None):
+        """ Constructor method
+
+        Expands keyword aliases of search queries (e.g. ``a`` to ``author:``).
+        All aliases are compiled into one regular expression, so that queries
+        are rewritten in a single pass.
+
+        :param aliases: dict mapping aliases to their expansion, defaults to
+            None
+        """
+
+        self.compile(aliases)
+
+    def compile(self, aliases):
+        """ Compile alias table
+
+        :param aliases: dict mapping aliases to their expansion
+        """
+
+        self.aliases = dict(aliases or {})
+        if not self.aliases:
+            self.pattern = None
+            return
+
+        # longest aliases first, so that they win over their prefixes
+        alternation = "|".join(
+            re.escape(alias) for alias in sorted(self.aliases, key=len, reverse=True)
+        )
+        self.pattern = re.compile(rf"\b(?:{alternation})\b")
+
+    def expand(self, query):
+        """ Replace aliases in query by their expansion
+
+        :param query: str search query
+        :return str
+        """
+
+        if self.pattern is None:
+            return query
+        return self.pattern.sub(lambda match: self.aliases[match.group(0)], query)
+
+    def normalise(self, query):
+        """ Expand aliases and collapse whitespace, which papis docmatch ignores,
+        so that queries meaning the same compare equal
+
+        :param query: str search query
+        :return str
+        """
+
+        return " ".join(self.expand(query).split())
+
+
+rewriter = QueryRewriter()
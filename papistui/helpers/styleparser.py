@@ -1,101 +1,188 @@
 import curses
+import re
+from collections import OrderedDict
 from html.parser import HTMLParser
-from itertools import product
 
 
-class StyleParser(HTMLParser):
+class TemplateCache(OrderedDict):
+    def __init__(self, maxsize=500):
+        """ Constructor method
+
+        Dictionary keeping only the most recently used entries, so that strings
+        that are only shown once (e.g. messages) do not pile up.
+
+        :param maxsize: int maximum number of entries, defaults to 500
+        """
+
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+# compiled templates by template string (see compile_template)
+templates = TemplateCache()
+# markup plans by template string, None if the markup of a template can only be
+# parsed after evaluation (see compile_markup)
+plans = TemplateCache()
+# marks the position of parts in curly braces while parsing markup of templates
+PLACEHOLDER = re.compile(r"\ue000([0-9]+)\ue001")
+
+COLORS = {
+    "bg": -1,
+    "black": 0,
+    "red": 1,
+    "green": 2,
+    "yellow": 3,
+    "blue": 4,
+    "magenta": 5,
+    "cyan": 6,
+    "white": 7,
+}
+
+ATTRIBUTES = {
+    "altcharset": curses.A_ALTCHARSET,
+    "blink": curses.A_BLINK,
+    "bold": curses.A_BOLD,
+    "dim": curses.A_DIM,
+    "invis": curses.A_INVIS,
+    "italic": curses.A_ITALIC,
+    "em": curses.A_ITALIC,
+    "normal": curses.A_NORMAL,
+    "protect": curses.A_PROTECT,
+    "reverse": curses.A_REVERSE,
+    "standout": curses.A_STANDOUT,
+    "underline": curses.A_UNDERLINE,
+    "horizontal": curses.A_HORIZONTAL,
+    "left": curses.A_LEFT,
+    "right": curses.A_RIGHT,
+    "top": curses.A_TOP,
+    "vertical": curses.A_VERTICAL,
+    "chartext": curses.A_CHARTEXT,
+}
+
+# color pairs beyond this number do not fit into the attributes of a character
+MAX_PAIRS = 255
+
+
+class StyleRegistry:
     def __init__(self):
-        """ Constructor method """
-        HTMLParser.__init__(self)
-        self.fmt = []
-        self.output = []
-        self.styledict = {}
-        self.create_style_dict()
-
-    def create_style_dict(self):
-        """ Create a dictionary of styles and their numeric representation """
-
-        colornames = {
-            "bg": -1,
-            "black": 0,
-            "red": 1,
-            "green": 2,
-            "yellow": 3,
-            "blue": 4,
-            "magenta": 5,
-            "cyan": 6,
-            "white": 7,
-        }
-        colorcombs = [
-            cmb for cmb in product(colornames.keys(), repeat=2) if cmb[0] != cmb[1]
-        ]
+        """ Constructor method
 
-        for i, cmb in enumerate(colorcombs):
-            if __name__ != "__main__":
-                curses.init_pair(i, colornames[cmb[0]], colornames[cmb[1]])
-                self.styledict.update(
-                    {f"{cmb[0]}_{cmb[1]}": curses.color_pair(i)}
-                )
-            else:
-                self.styledict.update({f"{cmb[0]}_{cmb[1]}": 0})
-
-        styledict = {
-            "altcharset": curses.A_ALTCHARSET,
-            "blink": curses.A_BLINK,
-            "bold": curses.A_BOLD,
-            "dim": curses.A_DIM,
-            "invis": curses.A_INVIS,
-            "italic": curses.A_ITALIC,
-            "em": curses.A_ITALIC,
-            "normal": curses.A_NORMAL,
-            "protect": curses.A_PROTECT,
-            "reverse": curses.A_REVERSE,
-            "standout": curses.A_STANDOUT,
-            "underline": curses.A_UNDERLINE,
-            "horizontal": curses.A_HORIZONTAL,
-            "left": curses.A_LEFT,
-            "right": curses.A_RIGHT,
-            "top": curses.A_TOP,
-            "vertical": curses.A_VERTICAL,
-            "chartext": curses.A_CHARTEXT,
-            "black": self.styledict["black_bg"],
-            "red": self.styledict["red_bg"],
-            "green": self.styledict["green_bg"],
-            "yellow": self.styledict["yellow_bg"],
-            "blue": self.styledict["blue_bg"],
-            "magenta": self.styledict["magenta_bg"],
-            "cyan": self.styledict["cyan_bg"],
-            "white": self.styledict["white_bg"],
-            "ansiblack": self.styledict["black_bg"],
-            "ansired": self.styledict["red_bg"],
-            "ansigreen": self.styledict["green_bg"],
-            "ansiyellow": self.styledict["yellow_bg"],
-            "ansiblue": self.styledict["blue_bg"],
-            "ansimagenta": self.styledict["magenta_bg"],
-            "ansicyan": self.styledict["cyan_bg"],
-            "ansiwhite": self.styledict["white_bg"],
-        }
-
-        self.styledict = {**self.styledict, **styledict}
+        Translates style names into curses attributes for all components.
+        Color pairs are only allocated once a combination of colors is used for
+        the first time and the attributes of style strings are memoised.
+        """
 
-    def compute_style(self, styles):
+        self.pairs = {}  # (foreground, background) -> attribute of color pair
+        self.styles = {}  # style string -> attribute
+
+    def reset(self):
+        """ Forget allocated color pairs and computed styles, required whenever
+        colors are (re)initialised """
+
+        self.pairs.clear()
+        self.styles.clear()
+        plans.clear()  # plans hold computed styles as well
+
+    def color(self, name):
+        """ Return the number of a color
+
+        :param name: str color name as in COLORS or colorN for color N of a
+            256 color terminal
+        :return int color number or None if unknown or not supported
+        """
+
+        if name in COLORS:
+            return COLORS[name]
+        if name.startswith("color") and name[5:].isdigit():
+            number = int(name[5:])
+            if number < getattr(curses, "COLORS", 8):
+                return number
+        return None
+
+    def pair(self, foreground, background):
+        """ Return the attribute of a color pair, allocating it on first use
+
+        :param foreground: int color number
+        :param background: int color number
+        :return int attribute, normal if no more pairs are available
+        """
+
+        key = (foreground, background)
+        if key not in self.pairs:
+            number = len(self.pairs) + 1
+            self.pairs[key] = curses.A_NORMAL
+            if number < min(getattr(curses, "COLOR_PAIRS", 0), MAX_PAIRS + 1):
+                try:
+                    curses.init_pair(number, foreground, background)
+                    self.pairs[key] = curses.color_pair(number)
+                except curses.error:
+                    pass
+        return self.pairs[key]
+
+    def lookup(self, name):
+        """ Return the attribute of a single style
+
+        :param name: str style e.g. bold, red (on default background), red_green
+            (foreground_background), ansired or color208_color236
+        :return int attribute or None if unknown
+        """
+
+        if name in ATTRIBUTES:
+            return ATTRIBUTES[name]
+        if name.startswith("ansi") and name[4:] in COLORS:
+            name = name[4:]
+        foreground, _, background = name.partition("_")
+        background = background or "bg"
+        if foreground == background:
+            return None
+        foreground = self.color(foreground)
+        background = self.color(background)
+        if foreground is None or background is None:
+            return None
+        return self.pair(foreground, background)
+
+    def compute(self, styles):
         """ Return the numeric representation of a (combination of) styles
 
         :param styles: str of styles separated by pipe e.g. bold|red
         :return int representation of style
         """
-        styles = styles.split("|")
-        styles = [style for style in styles if style != ""]
-        styles = [style for style in styles if style in self.styledict.keys()]
-        if len(styles) > 0:
-            style = 0
-            for i in styles:
-                style = style | self.styledict[i]
-        else:
-            style = curses.A_NORMAL
 
+        style = self.styles.get(styles)
+        if style is None:
+            style = curses.A_NORMAL
+            for name in styles.split("|"):
+                attribute = self.lookup(name) if name else None
+                if attribute is not None:
+                    style = style | attribute
+            self.styles[styles] = style
         return style
 
+
+registry = StyleRegistry()
+
+
+class MarkupParser(HTMLParser):
+    def __init__(self):
+        """ Constructor method
+
+        Collects text along with the style tags it is enclosed in.
+        """
+        HTMLParser.__init__(self)
+        self.fmt = []
+        self.output = []
+
     def handle_starttag(self, tag, attrs):
         self.fmt.append(tag)
 
@@ -105,6 +192,20 @@ class StyleParser(HTMLParser):
     def handle_endtag(self, tag):
         self.fmt.remove(tag)
 
+
+class StyleParser(MarkupParser):
+    def __init__(self):
+        """ Constructor method """
+        MarkupParser.__init__(self)
+
+    def compute_style(self, styles):
+        """ Return the numeric representation of a (combination of) styles
+
+        :param styles: str of styles separated by pipe e.g. bold|red
+        :return int representation of style
+        """
+        return registry.compute(styles)
+
     def parse(self, string, doc=None, additional=None, evaluate=True):
         """ Parse a string containing style tags and elements to be evaluated
 
@@ -118,7 +219,13 @@ class StyleParser(HTMLParser):
         self.fmt = []
         self.output = []
         if evaluate:
-            string = self.evaluate(string, doc=doc, info=additional)
+            plan = plans[string] if string in plans else compile_markup(self, string)
+            parts = self.evaluate_parts(string, doc=doc, info=additional)
+            if plan is not None:
+                result = self.apply_plan(plan, parts)
+                if result is not None:
+                    return result
+            string = "".join(parts)
         try:
             self.feed(string)
         except ValueError:
@@ -145,6 +252,39 @@ class StyleParser(HTMLParser):
 
         return result
 
+    def apply_plan(self, plan, parts):
+        """ Fill evaluated parts of a template into its markup plan
+
+        :param plan: tuple as returned by compile_markup
+        :param parts: list of str evaluated parts of the template
+        :return list of dict in the format returned by parse or None if the
+            evaluated parts contain markup themselves
+        """
+
+        segments, evaluated = plan
+        for idx in evaluated:
+            if "<" in parts[idx] or "&" in parts[idx]:
+                return None
+
+        result = []
+        posx = 0
+        for style, pieces in segments:
+            content = "".join(
+                piece if isinstance(piece, str) else parts[piece] for piece in pieces
+            )
+            if content:
+                result.append(
+                    {
+                        "content": content,
+                        "style": style,
+                        "posx": posx,
+                        "len": len(content),
+                    }
+                )
+                posx = posx + len(content)
+
+        return result
+
     def nonparse(self, string):
         """
         Return a list containing dict in the format returned by parse without parsing
@@ -379,14 +519,140 @@ class StyleParser(HTMLParser):
         :param info: dict context info available for evaluation, defaults to None
         """
 
-        result = ""
-        strings = self.parse_braces(strings)
-        for string in strings:
-            if string["eval"]:
-                try:
-                    result += eval(string["string"])
-                except Exception:
-                    result += "evalerr"
-            else:
-                result += string["string"]
-        return result
+        return "".join(self.evaluate_parts(strings, doc=doc, docs=docs, info=info))
+
+    def evaluate_parts(self, strings, doc=None, docs=None, info=None):
+        """ Evaluate content in curly braces and return all parts of the string
+
+        :param strings: str to be evaluated
+        :param doc: document to be available for evaluation, defaults to None
+        :param info: dict context info available for evaluation, defaults to None
+        :return list of str, one for each part returned by parse_braces
+        """
+
+        if strings in templates:
+            template = templates[strings]
+        else:
+            template = compile_template(strings)
+        return template(self, doc, docs, info)
+
+
+def compile_template(string):
+    """ Compile a template into a function evaluating its parts in curly braces
+
+    Parts that fail to compile or to evaluate (or do not return a string)
+    are replaced by "evalerr". The compiled function is cached (the most
+    recently used ones, see ``TemplateCache``).
+
+    :param string: str template
+    :return function taking (styleparser, doc, docs, info) and returning the
+        list of (evaluated) parts of the template
+    """
+
+    lines = ["def template(self, doc, docs, info):", "    result = []"]
+    for part in StyleParser.parse_braces(None, string):
+        if not part["eval"]:
+            lines.append(f"    result.append({part['string']!r})")
+            continue
+        try:
+            compile(part["string"], "<template>", "eval")
+        except Exception:
+            lines.append("    result.append('evalerr')")
+            continue
+        lines += [
+            "    try:",
+            f"        value = (\n{part['string']}\n)",
+            "        result.append(value if isinstance(value, str) else 'evalerr')",
+            "    except Exception:",
+            "        result.append('evalerr')",
+        ]
+    lines.append("    return result")
+
+    namespace = dict(globals())
+    exec(compile("\n".join(lines), "<template>", "exec"), namespace)
+    templates[string] = template = namespace["template"]
+    return template
+
+
+def compile_markup(styleparser, string):
+    """ Parse the style tags of a template once into a plan of segments
+
+    Each segment holds the numeric style and the pieces of its text, either
+    literal text or the index of a part in curly braces. Templates whose
+    parts in curly braces are not enclosed in text (e.g. ``<{doc["style"]}>``)
+    or that contain character references get no plan and are parsed after
+    evaluation. The plan is cached.
+
+    :param styleparser: StyleParser used to compute styles
+    :param string: str template
+    :return tuple (list of segments, list of indices of parts in curly braces)
+        or None
+    """
+
+    parts = styleparser.parse_braces(string)
+    evaluated = [idx for idx, part in enumerate(parts) if part["eval"]]
+    skeleton = "".join(
+        f"\ue000{idx}\ue001" if part["eval"] else part["string"]
+        for idx, part in enumerate(parts)
+    )
+
+    plans[string] = None
+    if "&" in skeleton:
+        return None
+    parser = MarkupParser()
+    try:
+        parser.feed(skeleton)
+    except ValueError:
+        return None
+    if not parser.output or parser.rawdata:
+        return None
+
+    segments = []
+    found = []
+    for output in parser.output:
+        if "<" in output["content"]:
+            return None
+        pieces = []
+        for idx, piece in enumerate(PLACEHOLDER.split(output["content"])):
+            if idx % 2:
+                pieces.append(int(piece))
+                found.append(int(piece))
+            elif piece:
+                pieces.append(piece)
+        segments.append((styleparser.compute_style(output["format"]), pieces))
+
+    if found != evaluated:
+        return None
+    plans[string] = plan = (segments, evaluated)
+    return plan
+
+
+def compile_templates(config):
+    """ Compile all templates of the configuration ahead of rendering
+
+    :param config: dict configuration options
+    """
+
+    def strings(obj):
+        if isinstance(obj, str):
+            yield obj
+        elif isinstance(obj, dict):
+            for value in obj.values():
+                yield from strings(value)
+        elif isinstance(obj, list):
+            for value in obj:
+                yield from strings(value)
+
+    documentlist = config["documentlist"]
+    sources = [
+        documentlist["multilinestyle"]["rows"],
+        [column["content"] for column in documentlist["tablestyle"]["columns"]],
+        config.get("statusbar", {}),
+        [
+            view.get("content")
+            for view in config["infowindow"].get("views", {}).values()
+        ],
+    ]
+    for string in strings(sources):
+        if string not in templates:
+            compile_template(string)
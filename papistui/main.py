@@ -31,8 +31,14 @@ from .components.selector import Screen
     default=False,
     help='Enter debugging mode when hitting "d" key',
 )
+@click.option(
+    "--startup-stats",
+    is_flag=True,
+    default=False,
+    help="Print how long it took to load documents and draw the first frame.",
+)
 @click.help_option("--help", "-h")
-def run(library, config, debug):
+def run(library, config, debug, startup_stats):
     """A curses based TUI for papis"""
 
     if not check_config(config):
@@ -58,6 +64,8 @@ def run(library, config, debug):
 
     tui = Tui(config=config, debugging=debug)
     tui.run()
+    if startup_stats:
+        print(tui.startup_report())
 
 
 def pick(options):
@@ -1,13 +1,17 @@
 import curses
 import io
 import os
+import queue
 import re
 import shlex
+import sqlite3
 import subprocess
 import sys
 import tempfile
+import time
 
 import papis.api as api
+import papis.document
 from papis.api import open_dir, open_file
 from papis.commands.browse import run as browse_document
 from papis.commands.edit import run as edit_document
@@ -20,13 +24,28 @@ from papistui.components.infowindow import InfoWindow
 from papistui.components.keyinfo import KeyInfo
 from papistui.components.messagebar import MessageBar
 from papistui.components.statusbar import StatusBar
+from papistui.features.fulltext import (
+    FulltextIndex,
+    FulltextIndexer,
+    attachments,
+    fulltext_file_name,
+    phrase_query,
+)
+from papistui.features.loader import DocumentLoader
+from papistui.features.parallel import close_pool
+from papistui.features.snapshot import Snapshot
+from papistui.features.store import DocumentStore
 from papistui.features.tagging import process_tags, tag_document
 from papistui.features.vim import Vim
+from papistui.features.watcher import LibraryWatcher
 from papistui.helpers.config import get_config
 from papistui.helpers.customargparse import ArgumentParser, HelpCall
-from papistui.helpers.document import Document  # noqa: F401
+from papistui.helpers.document import template_fields
+from papistui.helpers.frames import frames
 from papistui.helpers.keymappings import KeyMappings
-from papistui.helpers.styleparser import StyleParser
+from papistui.helpers.library import LibraryState
+from papistui.helpers.query import rewriter
+from papistui.helpers.styleparser import StyleParser, compile_templates, registry
 
 try:
     # this was introduced recently
@@ -40,6 +59,18 @@ except ImportError:
     pass
 
 
+# commands that only move through the documentlist and can be applied in a row
+# before drawing the result (see ``Tui.typeahead``)
+NAVIGATION = {
+    "scroll_down",
+    "scroll_up",
+    "page_down",
+    "page_up",
+    "jump_to_top",
+    "jump_to_bottom",
+}
+
+
 class Tui:
     def __init__(self, options=None, config=None, debugging=False):
         """ Constructor method
@@ -50,6 +81,7 @@ class Tui:
             ``d``, defaults to *False*
         """
 
+        self.startup = {"start": time.perf_counter(), "source": "options"}
         self._quit = False
         self.lock = False
         self._mode = "normal"
@@ -64,6 +96,8 @@ class Tui:
             self.config = config
         else:
             self.config = get_config()
+        compile_templates(self.config)
+        rewriter.compile(self.config["commandline"]["search"]["keyword_aliases"])
         self.km = KeyMappings(self.config)
         self.keymappings = self.config["keymappings"]
         self.keychain = []
@@ -91,23 +125,63 @@ class Tui:
 
         # Documentlist
         self.library = self.config["base"]["library"]
+        self.events = queue.Queue()  # filled by background threads
+        self.loader = None
+        self.load_error = None  # str message if loading in the background failed
+        self.watcher = None
+        self.indexer = None  # FulltextIndexer while updating the full text index
+        self.state = LibraryState(self.library)
+        self.snapshot = None
+        self.snapshot_stale = False
         if options:
-            docs = options
+            # documents passed in are handed back as they are when picked
+            self.store = DocumentStore()
+            items = self.store.add(options)
+            self.state.record(self.store.folders)
         else:
-            docs = self.getalldocs()
+            # only fields needed for display are kept if lazy_documents is set
+            self.store = DocumentStore(
+                template_fields(self.config)
+                if self.config["base"]["lazy_documents"]
+                else None
+            )
+            if self.config["base"]["snapshot"]:
+                self.snapshot = Snapshot(self.config)
+            items = self.loaddocs()
 
-        if len(docs) == 0:
+        if len(items) == 0:
             curses.endwin()
             print("No Documents retrieved!")
+            if self.load_error:
+                print(f"Loading documents failed: {self.load_error}")
             sys.exit()
 
-        self.doclist = DocumentList(docs, self.doclist_size, self.stdscr, self.config)
+        # documents loaded in the background are sorted once complete
+        presorted = self.loader is not None or (
+            self.startup["source"] == "snapshot" and self.snapshot.sorted
+        )
+        self.doclist = DocumentList(
+            items,
+            self.store,
+            self.doclist_size,
+            self.stdscr,
+            self.config,
+            presorted=presorted,
+        )
+
+        self.update_progress()
+        if not options and not self.loader:
+            self.startwatcher()
+            if self.config["fulltext"]["index"]:
+                self.startindexer()
 
         # tags
         self.tagfield = self.config["documentlist"]["tagfield"]
 
         # pass doclist to infowindow
         self.infowindow.doclist = self.doclist
+        # searches running in the background report back through the queue
+        self.doclist.events = self.events
 
         # KeyInfo
         self.keyinfo = KeyInfo(self.stdscr)
@@ -125,6 +199,8 @@ class Tui:
             config=self.config,
             commandparser=self.commandparser,
         )
+        # searches are completed from the values of documents
+        self.commandprompt.autocomp.values = self.doclist.complete
 
         # HelpWindow
         self.helpwindow = HelpWindow(
@@ -186,10 +262,211 @@ class Tui:
         docs = api.get_all_documents_in_lib(self.library)[::-1]
         return docs
 
+    def loaddocs(self):
+        """ Retrieve all documents from snapshot if still valid or from library
+        and put them into the store
+
+        :return array of document ids
+        """
+
+        start = time.perf_counter()
+        snapshot = self.snapshot.load() if self.snapshot else None
+        if snapshot is not None:
+            self.store, items = snapshot
+            self.startup["source"] = "snapshot"
+            self.state = self.snapshot.state
+        elif self.config["base"]["progressive_loading"]:
+            self.startup["source"] = "library"
+            return self.store.add(self.startloader())
+        else:
+            items = self.store.add(self.getalldocs())
+            self.startup["source"] = "library"
+            self.state.record(self.store.folders)
+            self.snapshot_stale = True
+
+        self.startup["load"] = time.perf_counter() - start
+        return items
+
+    def startloader(self):
+        """ Start loading documents in the background and wait for the first chunk
+
+        :return list of documents loaded so far
+        """
+
+        self.loader = DocumentLoader(
+            self.library,
+            self.events,
+            chunksize=self.config["base"]["loading_chunksize"],
+            first=self.doclist_size["sizey"],  # enough to fill the first page
+        )
+        self.loader.start()
+        while True:
+            event, data = self.events.get()
+            if event == "documents":
+                return data
+            elif event == "loaded":
+                self.loader = None
+                if data.error:
+                    self.load_error = data.error
+                return []
+
+    def loaded(self, loader):
+        """ Finish background loading: sort documents and record library state
+
+        :param loader: DocumentLoader that finished
+        """
+
+        self.loader = None
+        if loader.error:
+            self.message = (f"Loading documents failed: {loader.error}", "error")
+        if len(self.doclist.sortkeys) > 0:
+            self.doclist.resort()
+        self.state.record(self.store.folders)
+        self.snapshot_stale = True
+        self.startup["load"] = time.perf_counter() - self.startup["start"]
+        self.startwatcher()
+        if self.config["fulltext"]["index"]:
+            self.startindexer()
+
+    def startwatcher(self):
+        """ Start watching the library for changes if enabled """
+
+        if not self.config["base"]["watch"]:
+            return
+
+        self.watcher = LibraryWatcher(
+            self.library,
+            self.events,
+            debounce=self.config["base"]["watch_debounce"],
+            interval=self.config["base"]["watch_interval"],
+        )
+        self.watcher.start()
+
+    def startindexer(self):
+        """ Start bringing the full text index up to date in the background
+        unless already running or documents are still being loaded """
+
+        if self.indexer or self.loader:
+            return
+
+        self.indexer = FulltextIndexer(
+            fulltext_file_name(self.config),
+            attachments(self.store),
+            self.config["fulltext"]["extractors"],
+            self.events,
+        )
+        self.indexer.start()
+
+    def process_events(self):
+        """ Handle all events put into the queue by background threads """
+
+        handled = False
+        while True:
+            try:
+                event, data = self.events.get_nowait()
+            except queue.Empty:
+                break
+
+            handled = True
+            if event == "documents":
+                self.doclist.extend(data)
+            elif event == "loaded":
+                self.loaded(data)
+            elif event == "fulltext":
+                self.indexer = None
+                if data.error:
+                    message = f"Full text indexing failed: {data.error}"
+                    self.message = (message, "error")
+            elif event == "search":
+                self.searched(data)
+            elif event == "changes":
+                self.apply_changes(*self.state.check(data))
+                if self.infowindow.active:
+                    self.infowindow.display()
+
+        # the spinner keeps turning while searching
+        if handled or self.doclist.searching:
+            self.update_progress()
+            self.statusbar.info = self.doclist.getinfo()
+
+    def searched(self, worker):
+        """ Show results of a search that ran in the background
+
+        :param worker: SearchWorker that finished
+        """
+
+        result = self.doclist.publish(worker)
+        if result is None:
+            return
+        if "message" in result:
+            self.message = result["message"]
+        elif self.messagebar.active:
+            self.messagebar.destroy()
+        if self.infowindow.active:
+            self.infowindow.display()
+
+    def update_progress(self):
+        """ Update loading progress displayed in statusbar """
+
+        if not self.loader:
+            self.doclist.progress = ""
+        elif self.loader.total:
+            percent = 100 * len(self.doclist.items) // self.loader.total
+            self.doclist.progress = f" ({percent}%)"
+        else:
+            self.doclist.progress = " (loading)"
+
+    def touch(self, docs):
+        """ Register documents that were changed and saved from within papis-tui
+
+        :param docs: list of documents
+        """
+
+        self.state.touch(docs)
+        self.store.update(docs)
+        self.snapshot_stale = True
+
+    def save_snapshot(self):
+        """ Write snapshot of the library if documents changed since loading """
+
+        if not self.snapshot or not self.snapshot_stale or self.loader:
+            return
+
+        stats = None
+        if self.startup["source"] == "library" and "first_frame" in self.startup:
+            stats = {"cold": self.startup["first_frame"]}
+        self.snapshot.save(
+            self.store, self.doclist.items, self.doclist.sortkeys, self.state, stats
+        )
+        self.snapshot_stale = False
+
+    def startup_report(self):
+        """ Summarise how long it took until the first frame was drawn
+
+        :return str report
+        """
+
+        first_frame = self.startup.get("first_frame", 0)
+        report = (
+            f"startup: {first_frame:.3f}s "
+            f"(documents from {self.startup['source']}, "
+            f"{len(self.doclist.items)} documents, "
+            f"loading took {self.startup.get('load', 0):.3f}s)"
+        )
+        cold = self.snapshot.stats.get("cold") if self.snapshot else None
+        if self.startup["source"] == "snapshot" and cold and first_frame:
+            report += (
+                f"\ncold startup: {cold:.3f}s, warm startup: {first_frame:.3f}s "
+                f"({cold / first_frame:.1f}x faster)"
+            )
+        return report
+
     def setcolors(self):
         """ Setup curses colors (use curses colors) """
         curses.start_color()
         curses.use_default_colors()
+        # color pairs are allocated anew once styles are used
+        registry.reset()
 
     def calcsize(self):
         """Compute sizes for each component based on screen size and active
@@ -344,6 +621,12 @@ class Tui:
             pass
         finally:
             curses.endwin()
+            if self.watcher:
+                self.watcher.stop()
+            if self.indexer:
+                self.indexer.stop()
+            close_pool()
+            self.save_snapshot()
 
         if self.picker and self.picked:
             return self.doclist.selected_doc
@@ -355,8 +638,20 @@ class Tui:
         self.doclist.display()
         if self.config["infowindow"]["default_on"]:
             self.info_toggle()
+        self.startup["first_frame"] = time.perf_counter() - self.startup["start"]
         while True:
+            # everything drawn since the last input is shown at once
+            frames.update()
+            # poll for events from background threads while they are running
+            background = (
+                self.loader or self.watcher or self.indexer or self.doclist.searching
+            )
+            self.doclist.pad.timeout(100 if background else -1)
             ch = self.doclist.pad.getch()
+            frames.begin()
+            self.process_events()
+            if ch == -1:
+                continue
             if ch == curses.KEY_RESIZE:
                 self.resize()
             if ch == ord(":"):
@@ -368,9 +663,17 @@ class Tui:
                     break
             elif ch == ord("d") and self.debugging:
                 self.debug()
+            elif ch == 27 and self.doclist.cancel_search():
+                self.message = ("Search cancelled", "neutral")
+                self.statusbar.info = self.doclist.getinfo()
+                ch = None
 
             if ch and not self.lock:
-                self.handle_keypress(ch)
+                commands = self.typeahead(ch)
+                if commands:
+                    self.navigate(commands)
+                else:
+                    self.handle_keypress(ch)
                 self.statusbar.info = self.doclist.getinfo()
 
             if self._quit:
@@ -394,9 +697,56 @@ class Tui:
                 self.keychain = key
                 self.keyinfo.display(self.doclist, options)
             else:
+                if self.keychain:
+                    # remove the hints of the abandoned key combination
+                    self.doclist.display()
                 self.keychain = []
                 self.commandinfo.destroy()
 
+    def typeahead(self, ch):
+        """ Collect navigation keys that were typed ahead of the screen
+
+        Keys already waiting are read without blocking as long as they are
+        mapped to one of the commands in ``NAVIGATION``, so that e.g. a held
+        down key is handled at once instead of drawing every step. The first
+        other key is put back to be handled as usual.
+
+        :param ch: keycode of the key that was pressed
+        :return list of navigation commands, empty if ch is no navigation key
+        """
+
+        commands = []
+        if self.keychain or self.mode != "normal":
+            return commands
+
+        limit = self.config["base"]["typeahead"]
+        while ch != -1:
+            match = self.km.match([ch])
+            if not match or match["cmd"] not in NAVIGATION:
+                if commands:
+                    curses.ungetch(ch)
+                break
+            commands.append(match["cmd"])
+            if len(commands) >= limit:
+                break
+            self.doclist.pad.timeout(0)
+            ch = self.doclist.pad.getch()
+
+        return commands
+
+    def navigate(self, commands):
+        """ Move through documentlist and display the final position only
+
+        :param commands: list of navigation commands
+        """
+
+        self.clean()
+        for command in commands:
+            getattr(self.doclist, command)()
+        self.doclist.display()
+        if self.infowindow.active:
+            self.infowindow.display()
+
     def quit(self, *args):
         """ Quit tui """
         self._quit = True
@@ -442,14 +792,38 @@ class Tui:
         """
 
         self.mode = "search"
-        text = self.commandprompt.edit(mode=self.mode)
+        live = self.config["commandline"]["search"]["live"]
+        text = self.commandprompt.edit(
+            mode=self.mode,
+            on_change=self.live_search if live else None,
+            debounce=self.config["commandline"]["search"]["live_debounce"],
+        )
         if text == "":
             self.mode = "normal"
         else:
             command = f"search {text}"
             self.handle_command(command)
+        if live:
+            # show previous documents again if search was cancelled or failed
+            self.doclist.cancel_live_search()
+            self.statusbar.info = self.doclist.getinfo()
         return {"exit_status": 0}
 
+    def live_search(self, text):
+        """ Filter documentlist while a search is typed
+
+        :param text: str current content of the command prompt
+        """
+
+        try:
+            query = " ".join(shlex.split(text))
+        except ValueError:  # quotes not closed yet
+            return
+        self.doclist.search_live(query)
+        self.statusbar.info = self.doclist.getinfo()
+        if self.infowindow.active:
+            self.infowindow.display()
+
     def raise_helpwindow(self, *args):
         """ Display Helpwindow """
 
@@ -467,6 +841,110 @@ class Tui:
             query = " ".join(vars(args)["query"])
             return self.doclist.docmatch(query=query)
 
+    def saved_search(self, args=None):
+        """ Show results of a search saved in the configuration
+
+        :return dict with exit status
+        """
+
+        if args:
+            return self.doclist.show_saved(vars(args)["name"])
+
+    def fuzzy(self, args=None):
+        """ Search for documents similar to query
+
+        :return dict with exit status
+        """
+
+        if args:
+            index = self.store.trigrams
+            indexed = len(index.lengths) if index is not None else 0
+            result = self.doclist.fuzzy(" ".join(vars(args)["query"]))
+            # the index is stored in the snapshot as far as it was built
+            grown = self.store.trigrams is not index or len(index.lengths) != indexed
+            self.snapshot_stale = self.snapshot_stale or grown
+            return result
+
+    def fulltext(self, args=None):
+        """ Search the text of attached files and show snippets of the
+        matches in the info window
+
+        :return dict with exit status
+        """
+
+        if not args:
+            return
+
+        # the index is searched as it is while it is brought up to date
+        self.startindexer()
+        try:
+            index = FulltextIndex(fulltext_file_name(self.config))
+        except sqlite3.Error as e:
+            return {
+                "exit_status": 2,
+                "message": (f"Full text search is not available: {e}", "error"),
+            }
+        try:
+            results = index.search(phrase_query(vars(args)["query"]))
+        except sqlite3.OperationalError as e:
+            return {
+                "exit_status": 2,
+                "message": (f"Invalid full text query: {e}", "error"),
+            }
+        finally:
+            index.close()
+
+        folders = self.store.find()
+        snippets = {
+            folders[folder]: snippet
+            for folder, snippet in results.items()
+            if folder in folders
+        }
+        indexing = ""
+        if self.indexer:
+            indexing = (
+                f"attachments are still being indexed ({self.indexer.done} of "
+                f"{self.indexer.total} documents)"
+            )
+        if len(snippets) == 0:
+            message = "No matching documents found"
+            if indexing:
+                message += f", {indexing}"
+            return {"exit_status": 2, "message": (message, "error")}
+
+        self.doclist.show_ranked(list(snippets))
+        self.infowindow.show_snippets(snippets)
+        self.resize()
+        if indexing:
+            message = f"Results may be incomplete, {indexing}"
+            return {"exit_status": 0, "message": (message, "neutral")}
+        return {"exit_status": 0}
+
+    def facet(self, args=None):
+        """ Show value counts of the facet fields in the info window, narrowing
+        the view down to documents having a value if one is given
+
+        :return dict with exit status
+        """
+
+        if not args:
+            return
+
+        result = {"exit_status": 0}
+        selection = vars(args)["selection"]
+        if len(selection) == 1:
+            message = "Give a field and a value, e.g. facet tags unread"
+            return {"exit_status": 2, "message": (message, "error")}
+        if selection:
+            field, *value = selection
+            result = self.doclist.facet(field, " ".join(value))
+            if result["exit_status"] != 0:
+                return result
+
+        self.infowindow.show_facets()
+        self.resize()
+        return result
+
     def sort(self, args=None):
         """ Sort documents
 
@@ -530,7 +1008,9 @@ class Tui:
         """
 
         curses.endwin()
-        edit_document(self.doclist.selected_doc)
+        doc = self.doclist.selected_doc
+        edit_document(doc)
+        self.touch([doc])
         self.stdscr.refresh()
         return {"exit_status": 0}
 
@@ -547,13 +1027,105 @@ class Tui:
         return {"exit_status": 0}
 
     def reload(self, *args):
-        """ Reload all documents from library into documentlist
+        """ Reload documents that were added, modified or removed on disk since
+        they were last read
 
         :return dict with exit status
         """
 
-        self.doclist.items = self.getalldocs()
-        return {"exit_status": 0}
+        if self.loader:
+            return {
+                "exit_status": 2,
+                "message": ("Library is still being loaded", "error"),
+            }
+
+        added, modified, removed = self.apply_changes(*self.state.scan())
+        return {
+            "exit_status": 0,
+            "message": (
+                f"Reloaded library: {added} added, {modified} changed, "
+                f"{removed} removed",
+                "success",
+            ),
+        }
+
+    def memory(self, *args):
+        """ Report memory used per document compared to complete documents
+
+        :return dict with exit status
+        """
+
+        store, objects = self.store.memory()
+        mode = "columns" if self.store.columns is not None else "documents"
+        return {
+            "exit_status": 0,
+            "message": (
+                f"{len(self.store)} documents: {store} bytes per document "
+                f"({mode}), {objects} bytes as complete documents",
+                "success",
+            ),
+        }
+
+    def frame_stats(self, *args):
+        """ Report how many frames were drawn and how long they took
+
+        :return dict with exit status
+        """
+
+        return {"exit_status": 0, "message": (frames.report(), "neutral")}
+
+    def cache_stats(self, *args):
+        """ Report how often rendered rows and search results were taken from
+        the cache
+
+        :return dict with exit status
+        """
+
+        caches = {
+            "rows": self.doclist.rowcache,
+            "searches": self.doclist.querycache,
+        }
+        report = []
+        for name, cache in caches.items():
+            lookups = cache.hits + cache.misses
+            rate = 100 * cache.hits / lookups if lookups else 0
+            report.append(
+                f"{name}: {cache.hits} of {lookups} from cache ({rate:.0f}%), "
+                f"{len(cache)} cached"
+            )
+        return {"exit_status": 0, "message": ("; ".join(report), "neutral")}
+
+    def apply_changes(self, added, modified, removed):
+        """ Read documents that changed on disk and patch them into documentlist
+
+        :param added: list of folders of new documents
+        :param modified: list of folders of modified documents
+        :param removed: list of folders of removed documents
+        :return tuple with number of added, modified and removed documents
+        """
+
+        folders = self.store.find()
+        modified = [
+            self.store.document(folders[folder])
+            for folder in modified
+            if folder in folders
+        ]
+        removed = [
+            self.store.document(folders[folder])
+            for folder in removed
+            if folder in folders
+        ]
+        added = [papis.document.from_folder(folder) for folder in added]
+        for doc in modified:
+            doc.load()
+
+        if added or modified or removed:
+            self.doclist.update(added, modified, removed)
+            # changes noticed by the watcher are shown without waiting for a key
+            self.doclist.display()
+            self.statusbar.info = self.doclist.getinfo()
+            self.snapshot_stale = True
+        return len(added), len(modified), len(removed)
 
     def rm(self, args):
         """ Implementation of papis rm command (incomplete)
@@ -571,7 +1143,7 @@ class Tui:
                 for doc in docs:
                     rm_document(doc)
 
-                self.doclist.items = self.getalldocs()
+                self.reload()
                 return {
                     "exit_status": 0,
                     "message": (f"{len_docs} document(s) deleted!", "success"),
@@ -715,8 +1287,8 @@ class Tui:
         if command.startswith("papis "):
             self.papis_cmd(command)
         else:
-            commands = shlex.split(command.strip())
             try:
+                commands = shlex.split(command.strip())
                 args = self.commandparser.parse_args(commands)
                 result = args.func(args)  # call the default function
                 if result is None:  # try to avoid by returning exit status
@@ -791,6 +1363,7 @@ class Tui:
         tags = process_tags(args["tags"])
         for doc in docs:
             tag_document(doc, tags, self.tagfield)
+        self.touch(docs)
 
         return {"exit_status": 0}
 
@@ -803,7 +1376,7 @@ class Tui:
         string = self.styleparser.evaluate(
             command,
             doc=self.doclist.selected_doc,
-            docs=self.doclist.marked)
+            docs=self.doclist.marked_docs())
         cmd = shlex.split(string)
 
         curses.endwin()
@@ -916,6 +1489,47 @@ class Tui:
         )
         search.set_defaults(func=self.search)
 
+        facet = subparsers.add_parser(
+            "facet",
+            description=(
+                "Show value counts of facet fields, narrow view down to a value"
+            ),
+        )
+        facet.add_argument(
+            "selection",
+            help="Field and value to narrow the view down to",
+            nargs="*",
+            type=str,
+        )
+        facet.set_defaults(func=self.facet)
+
+        saved_search = subparsers.add_parser(
+            "saved_search", description="Show results of a saved search"
+        )
+        saved_search.add_argument(
+            "name", help="Name of the search in the configuration", type=str
+        )
+        saved_search.set_defaults(func=self.saved_search)
+
+        fuzzy = subparsers.add_parser(
+            "fuzzy", description="Search for documents similar to query"
+        )
+        fuzzy.add_argument(
+            "query", help="Words to look for in documents", nargs="+", type=str
+        )
+        fuzzy.set_defaults(func=self.fuzzy)
+
+        fulltext = subparsers.add_parser(
+            "fulltext", description="Search the text of attached files"
+        )
+        fulltext.add_argument(
+            "query",
+            help="Words (or quoted phrases) to look for in attached files",
+            nargs="+",
+            type=str,
+        )
+        fulltext.set_defaults(func=self.fulltext)
+
         sort = subparsers.add_parser("sort", description="Sort documents")
         sort.add_argument(
             "sortkeys",
@@ -1012,6 +1626,21 @@ class Tui:
         reload = subparsers.add_parser("reload", description="Reload library")
         reload.set_defaults(func=self.reload)
 
+        memory = subparsers.add_parser(
+            "memory", description="Show memory used per document"
+        )
+        memory.set_defaults(func=self.memory)
+
+        frame_stats = subparsers.add_parser(
+            "frame_stats", description="Show screen update statistics"
+        )
+        frame_stats.set_defaults(func=self.frame_stats)
+
+        cache_stats = subparsers.add_parser(
+            "cache_stats", description="Show row and search cache statistics"
+        )
+        cache_stats.set_defaults(func=self.cache_stats)
+
         cmd = subparsers.add_parser("cmd", description="Put string on commandline")
         cmd.add_argument(
             "string", help="Provide a string to put on commandline", nargs="+", type=str
@@ -0,0 +1,107 @@
+import copy
+import json
+import os
+import pty
+import select
+import signal
+import sys
+import textwrap
+import time
+
+import pytest
+import yaml
+
+from papistui.helpers.config import default_config
+
+
+def write_document(folder, **fields):
+    """ Write a papis document with the given fields
+
+    :param folder: pathlib.Path of the document folder
+    :param fields: fields of the document
+    """
+
+    folder.mkdir(parents=True, exist_ok=True)
+    with open(folder / "info.yaml", "w") as f:
+        yaml.safe_dump(fields, f)
+
+
+@pytest.fixture
+def library(tmp_path):
+    """ Papis library with a few documents and a configuration for papis and
+    papis-tui, both found through the environment returned in ``env``
+    """
+
+    path = tmp_path / "lib"
+    for idx in range(3):
+        write_document(
+            path / f"doc{idx}",
+            ref=f"ref{idx}",
+            title=f"Title {idx}",
+            author=f"Author {idx}",
+            year=2000 + idx,
+        )
+
+    config = tmp_path / "config" / "papis"
+    config.mkdir(parents=True)
+    (config / "config").write_text(
+        "[settings]\ndefault-library = lib\nuse-cache = False\n\n"
+        f"[lib]\ndir = {path}\n"
+    )
+    tui = copy.deepcopy(default_config)
+    tui["base"] = {"snapshot": False, "progressive_loading": False, "watch": False}
+    tui["fulltext"] = {"file": str(tmp_path / "fulltext.sqlite")}
+    with open(config / "papistui.yaml", "w") as f:
+        yaml.safe_dump(tui, f)
+
+    env = dict(
+        os.environ,
+        TERM="xterm-256color",
+        XDG_CONFIG_HOME=str(tmp_path / "config"),
+        XDG_CACHE_HOME=str(tmp_path / "cache"),
+    )
+    return {"path": path, "env": env, "tmp": tmp_path}
+
+
+@pytest.fixture
+def terminal(library):
+    """ Run a script in a pseudo terminal, as curses needs one, and return what
+    the script passed to ``report``
+    """
+
+    def run(script, timeout=30):
+        result = library["tmp"] / "result.json"
+        prelude = (
+            "import json\n"
+            "def report(data):\n"
+            f"    with open({str(result)!r}, 'w') as f:\n"
+            "        json.dump(data, f)\n"
+        )
+        pid, fd = pty.fork()
+        if pid == 0:
+            os.execve(
+                sys.executable,
+                [sys.executable, "-c", prelude + textwrap.dedent(script)],
+                library["env"],
+            )
+        output = b""
+        deadline = time.monotonic() + timeout
+        while True:
+            ready, _, _ = select.select([fd], [], [], deadline - time.monotonic())
+            if not ready:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                pytest.fail(f"script did not finish within {timeout} seconds")
+            try:
+                data = os.read(fd, 65536)
+            except OSError:
+                break
+            if not data:
+                break
+            output += data
+        _, status = os.waitpid(pid, 0)
+        assert status == 0, output.decode(errors="replace")
+        with open(result) as f:
+            return json.load(f)
+
+    return run
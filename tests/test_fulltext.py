@@ -0,0 +1,62 @@
+import pytest
+
+from papistui.features.fulltext import FulltextIndex, phrase_query
+
+
+@pytest.fixture
+def index(tmp_path):
+    """ FulltextIndex holding the text of a few files """
+
+    index = FulltextIndex(str(tmp_path / "fulltext.sqlite"))
+    texts = {
+        "hyphen": "results of the foo-bar experiment",
+        "apart": "a foo walks into a bar",
+        "cpp": "templates in c++ and c",
+        "colon": "the ratio a:b is constant",
+        "quote": 'he said "spectral gap" twice',
+        "prefix": "spectroscopy of stars",
+    }
+    for name, text in texts.items():
+        index.store(f"/library/{name}", f"/library/{name}/file.txt", 0, text)
+    yield index
+    index.close()
+
+
+def search(index, *words):
+    return set(index.search(phrase_query(list(words))))
+
+
+def test_words_are_quoted():
+    assert phrase_query(["foo-bar", "c++"]) == '"foo-bar" "c++"'
+    assert phrase_query(['say "hi"']) == '"say ""hi"""'
+    assert phrase_query(["spectral gap"]) == '"spectral gap"'
+
+
+def test_operators_and_prefixes_are_kept():
+    assert phrase_query(["foo", "OR", "bar"]) == '"foo" OR "bar"'
+    assert phrase_query(["spect*"]) == '"spect"*'
+    assert phrase_query(["*"]) == '"*"'
+
+
+def test_hyphens(index):
+    assert search(index, "foo-bar") == {"/library/hyphen"}
+    assert search(index, "foo", "bar") == {"/library/hyphen", "/library/apart"}
+
+
+def test_characters_with_meaning_in_queries(index):
+    assert search(index, "c++") == {"/library/cpp"}
+    assert search(index, "a:b") == {"/library/colon"}
+
+
+def test_quotes(index):
+    assert search(index, '"spectral') == {"/library/quote"}
+    assert search(index, '"spectral gap"') == {"/library/quote"}
+    assert search(index, "spectral gap") == {"/library/quote"}
+
+
+def test_operators(index):
+    assert search(index, "stars", "OR", "experiment") == {
+        "/library/prefix",
+        "/library/hyphen",
+    }
+    assert search(index, "spect*") == {"/library/prefix", "/library/quote"}
@@ -0,0 +1,74 @@
+import random
+import string
+import time
+
+import pytest
+
+import papis.document
+from papistui.features.fuzzy import TrigramIndex
+from papistui.features.store import DocumentStore
+
+FIELDS = ["title", "author", "ref", "journal"]
+BUDGET = 0.05
+# the budget is checked between steps, each of which may take a moment
+MARGIN = 0.05
+
+
+@pytest.fixture(scope="module")
+def store():
+    """ DocumentStore with a large library of random words """
+
+    rng = random.Random(1)
+    vocabulary = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+        for _ in range(50000)
+    ]
+    docs = []
+    for idx in range(40000):
+        doc = papis.document.from_data({
+            "title": " ".join(rng.choices(vocabulary, k=8)),
+            "author": " and ".join(rng.choices(vocabulary, k=2)),
+            "ref": f"ref{idx}",
+            "journal": rng.choice(vocabulary),
+        })
+        doc.set_folder(f"/library/doc{idx}")
+        docs.append(doc)
+    docs[123]["title"] = "spectral gap of random graphs"
+
+    store = DocumentStore()
+    store.add(docs)
+    return store
+
+
+def test_building_index_keeps_budget(store):
+    index = TrigramIndex(FIELDS)
+    start = time.perf_counter()
+    built = index.refresh(store, start + BUDGET)
+    assert time.perf_counter() - start < BUDGET + MARGIN
+    assert not built
+
+    # indexing goes on where it stopped
+    while not index.refresh(store, time.perf_counter() + BUDGET):
+        pass
+    ranked, complete = index.search(store, "spectrl gap", budget=10)
+    assert complete
+    assert ranked[0] == 123
+
+
+def test_search_keeps_budget(store):
+    index = TrigramIndex(FIELDS)
+    index.refresh(store)
+
+    # refs share their first trigrams with every other ref
+    for query in ("spectrl gap", "ref ref1 ref12 re", "ab abc abcd bcd"):
+        start = time.perf_counter()
+        index.search(store, query, budget=BUDGET)
+        assert time.perf_counter() - start < BUDGET + MARGIN
+
+
+def test_similar_stops_at_deadline(store):
+    index = TrigramIndex(FIELDS)
+    index.refresh(store)
+
+    assert index.similar("ref12", 0.3, deadline=time.perf_counter()) is None
+    assert (10, "ref12") in index.similar("ref12", 0.3)
@@ -0,0 +1,69 @@
+import queue
+
+import papis.document
+from papistui.features.loader import DocumentLoader
+
+
+def events_of(loader):
+    """ Return all events a loader put into its queue """
+
+    events = []
+    while not loader.events.empty():
+        events.append(loader.events.get())
+    return events
+
+
+def test_loads_documents_in_chunks(library):
+    loader = DocumentLoader(str(library["path"]), queue.Queue(), chunksize=2, first=1)
+    loader.run()
+
+    events = events_of(loader)
+    assert [event for event, _ in events] == ["documents", "documents", "loaded"]
+    assert [len(docs) for _, docs in events[:-1]] == [1, 2]
+    assert events[-1][1] is loader
+    assert loader.error is None
+
+
+def test_failure_is_reported(library, monkeypatch):
+    def from_folder(folder):
+        if folder.endswith("doc1"):
+            raise PermissionError(f"Permission denied: '{folder}'")
+        return papis.document.Document(folder)
+
+    monkeypatch.setattr(papis.document, "from_folder", from_folder)
+    loader = DocumentLoader(str(library["path"]), queue.Queue(), chunksize=1)
+    loader.run()
+
+    events = events_of(loader)
+    assert events[-1] == ("loaded", loader)
+    assert "Permission denied" in loader.error
+    assert all(event == "documents" for event, _ in events[:-1])
+
+
+def test_tui_shows_failure_instead_of_waiting(terminal):
+    output = terminal(
+        """
+        import contextlib
+        import io
+
+        import papis.document
+        from papistui.helpers.config import get_config
+        from papistui.tui import Tui
+
+        def from_folder(folder):
+            raise PermissionError(f"Permission denied: '{folder}'")
+
+        papis.document.from_folder = from_folder
+        config = get_config()
+        config["base"]["progressive_loading"] = True
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            try:
+                Tui(config=config)
+            except SystemExit:
+                pass
+        report(output.getvalue())
+        """
+    )
+
+    assert "Loading documents failed: Permission denied" in output
@@ -0,0 +1,40 @@
+def test_watcher_changes_are_drawn_without_key(library, terminal):
+    folder = library["path"] / "doc1"
+    rows = terminal(
+        f"""
+        import curses
+        import os
+
+        from papistui.tui import Tui
+
+        def rows(tui):
+            pad = tui.doclist.pad
+            return [
+                pad.instr(row, 0).decode(errors="replace")
+                for row in range(pad.getmaxyx()[0])
+            ]
+
+        tui = Tui()
+        tui.doclist.display()
+        before = rows(tui)
+
+        info = os.path.join({str(folder)!r}, "info.yaml")
+        with open(info) as f:
+            content = f.read()
+        with open(info, "w") as f:
+            f.write(content.replace("Title 1", "Changed on disk"))
+        stamp = os.stat(info).st_mtime + 10
+        os.utime(info, (stamp, stamp))
+
+        # as put into the queue by the LibraryWatcher
+        tui.events.put(("changes", [{str(folder)!r}]))
+        tui.process_events()
+        after = rows(tui)
+        curses.endwin()
+        report({{"before": before, "after": after}})
+        """
+    )
+
+    assert any("Title 1" in row for row in rows["before"])
+    assert not any("Title 1" in row for row in rows["after"])
+    assert any("Changed on disk" in row for row in rows["after"])